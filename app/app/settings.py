@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -24,7 +27,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECRET_KEY = 'django-insecure-f=x9jfm$(4udb$b-t$!8un&$9b@y0r%92n7z1!@$w!$_&p&y%v'
 
 # get from server enviroment
-ECRET_KEY = os.environ.get('SECRET_KEY', 'changeme')
+SECRET_KEY = os.environ.get('SECRET_KEY', 'changeme')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 # DEBUG = True
@@ -54,10 +57,14 @@ INSTALLED_APPS = [
     'drf_spectacular',
     'core',
     'user',
+    'recipe',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -111,6 +118,28 @@ DATABASES = {
 }
 
 
+# Cache
+# auth tokens, user generations, stats and throttle counters are cached
+# and must be shared by every uwsgi worker and the purge/similarity
+# services, so REDIS_URL is required outside of DEBUG. A per process
+# memory cache would keep revoked tokens valid in the other processes.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+elif DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    raise ImproperlyConfigured('REDIS_URL is required when DEBUG is off.')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -130,6 +159,33 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# first hasher hashes new passwords, the others only verify old hashes
+# which are upgraded to the first one on the next successful login
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'bcrypt': 'core.hashers.BCryptSHA256PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'Unknown PASSWORD_HASHER {PASSWORD_HASHER!r}, '
+        f'use one of: {", ".join(_PASSWORD_HASHERS)}.')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS.pop(PASSWORD_HASHER)]
+PASSWORD_HASHERS.extend(_PASSWORD_HASHERS.values())
+
+# hashing cost, changing it rehashes passwords on next login
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 0)) or None
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8))
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -166,6 +222,14 @@ AUTH_USER_MODEL = 'core.User'
 # API documentation schema
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # "<requests>/<window>", e.g. '5/m' or '20/10m' (see user.throttles)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '30/m'),
+        'login_email': os.environ.get('THROTTLE_LOGIN_EMAIL', '5/m'),
+        'register_ip': os.environ.get('THROTTLE_REGISTER_IP', '20/h'),
+        'register_email': os.environ.get('THROTTLE_REGISTER_EMAIL', '3/h'),
+        'recipe_share': os.environ.get('THROTTLE_RECIPE_SHARE', '30/h'),
+    },
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 10,
 }
@@ -177,3 +241,94 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# response compression (core.middleware.CompressionMiddleware)
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/vnd.oai.openapi',
+    'application/vnd.oai.openapi+json',
+    'text/html',
+    'text/plain',
+]
+
+# pre-generated schema written by `manage.py build_schema`
+SCHEMA_FILE = os.environ.get('SCHEMA_FILE', '/vol/web/schema/openapi.yaml')
+
+# seconds a readiness report is reused before checking dependencies again
+HEALTH_CHECK_TTL = int(os.environ.get('HEALTH_CHECK_TTL', 5))
+
+# per-request query count and timing (Server-Timing header + log)
+REQUEST_TIMING = bool(int(os.environ.get('REQUEST_TIMING', 0)))
+
+# prometheus metrics collected by core.middleware.MetricsMiddleware
+METRICS_ENABLED = bool(int(os.environ.get('METRICS_ENABLED', 1)))
+# bearer token of /api/metrics/, the endpoint is disabled without it
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# API tokens (core.models.AuthToken)
+TOKEN_TTL = timedelta(hours=int(os.environ.get('TOKEN_TTL_HOURS', 24 * 7)))
+# seconds a token lookup is served from cache
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 60))
+# seconds between batched writes of AuthToken.last_used
+TOKEN_LAST_USED_FLUSH_INTERVAL = int(
+    os.environ.get('TOKEN_LAST_USED_FLUSH_INTERVAL', 300))
+
+# signed tokens (user.signing), TTLs in seconds
+SIGNED_TOKEN_ACCESS_TTL = int(os.environ.get('SIGNED_TOKEN_ACCESS_TTL', 300))
+SIGNED_TOKEN_REFRESH_TTL = int(
+    os.environ.get('SIGNED_TOKEN_REFRESH_TTL', 14 * 24 * 3600))
+# previous SECRET_KEYs still accepted while rotating, comma separated
+SIGNED_TOKEN_FALLBACK_KEYS = [
+    key for key in os.environ.get('SIGNED_TOKEN_FALLBACK_KEYS', '').split(',')
+    if key
+]
+
+# seconds recipe stats stay cached, writes invalidate them earlier
+RECIPE_STATS_CACHE_TTL = int(os.environ.get('RECIPE_STATS_CACHE_TTL', 3600))
+
+# seconds a sync window trails the current time so rows of transactions
+# still running when the client syncs aren't skipped (see recipe.sync)
+SYNC_LAG = int(os.environ.get('SYNC_LAG', 5))
+
+# seconds soft deleted recipes, tags and ingredients are kept before
+# purge_deleted removes them
+PURGE_DELETED_AFTER = int(os.environ.get('PURGE_DELETED_AFTER', 3600))
+# seconds tombstones are kept, older sync watermarks need a full sync
+TOMBSTONE_TTL = int(os.environ.get('TOMBSTONE_TTL', 30 * 24 * 3600))
+
+# admin changelists of bigger tables show the planner estimate instead of
+# COUNT(*) when unfiltered (core.admin.EstimatedCountPaginator)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
+
+# most copies one request of the recipe copy action may create
+RECIPE_COPY_MAX = int(os.environ.get('RECIPE_COPY_MAX', 20))
+
+# public recipe feed (recipe.public): entries are fresh for CACHE_TTL,
+# then served stale for up to STALE_TTL while one request recomputes
+PUBLIC_RECIPE_CACHE_TTL = int(os.environ.get('PUBLIC_RECIPE_CACHE_TTL', 60))
+PUBLIC_RECIPE_STALE_TTL = int(os.environ.get('PUBLIC_RECIPE_STALE_TTL', 300))
+# Cache-Control max-age sent to browsers and CDNs
+PUBLIC_RECIPE_MAX_AGE = int(os.environ.get('PUBLIC_RECIPE_MAX_AGE', 60))
+PUBLIC_FEED_PAGE_SIZE = int(os.environ.get('PUBLIC_FEED_PAGE_SIZE', 20))
+PUBLIC_FEED_MAX_PAGES = int(os.environ.get('PUBLIC_FEED_MAX_PAGES', 50))
+
+# catalog names resolved per process without a query (recipe.catalog)
+CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 100000))
@@ -0,0 +1,21 @@
+"""
+Django settings for running the test suite.
+
+Usage: python manage.py test --settings=app.settings_test
+"""
+from app.settings import *  # noqa: F401,F403
+
+# tests create many users, a fast hasher keeps the suite CPU cheap.
+# never use this outside tests
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# disable throttling, tests of throttles override the rates they need
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_THROTTLE_RATES': {
+        scope: None
+        for scope in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']  # noqa: F405
+    },
+}
@@ -13,10 +13,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.contrib import admin
 from django.urls import include, path
 
@@ -28,7 +25,10 @@ from core import views as core_views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health-check/', core_views.health_check, name='health-check'),
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
+    path('api/health-check/ready/', core_views.readiness_check,
+         name='readiness-check'),
+    path('api/metrics/', core_views.metrics_view, name='metrics'),
+    path('api/schema/', core_views.SchemaView.as_view(), name='api-schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='api-schema'),
          name='api-docs'),
     path("api/user/", include('user.urls')),
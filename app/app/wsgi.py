@@ -14,3 +14,18 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# generate/load the API schema once per process instead of on first request
+from core.schema import load_schema  # noqa: E402
+
+load_schema()
+
+# release the metrics of a worker when uwsgi stops or reloads it
+from core import metrics  # noqa: E402
+
+try:
+    import uwsgi
+except ImportError:
+    pass
+else:
+    uwsgi.atexit = metrics.mark_process_dead
@@ -1,17 +1,123 @@
 """
 Django admin customization.
 """
-from django.contrib import admin
+import calendar
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from core import models
+from user.deletion import delete_user
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the planner row estimate for big unfiltered lists.
+
+    On PostgreSQL an unfiltered changelist reads pg_class.reltuples
+    instead of running COUNT(*) over the table, the exact count is only
+    used below ADMIN_ESTIMATED_COUNT_THRESHOLD rows or when filtered.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 until the table was first analyzed
+            if row and row[0] > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+def _periods(first, last, kind):
+    """Yield (start, end) of every year/month/day from first to last."""
+    start = first.replace(hour=0, minute=0, second=0, microsecond=0)
+    if kind in ('year', 'month'):
+        start = start.replace(day=1)
+    if kind == 'year':
+        start = start.replace(month=1)
+    while start <= last:
+        if kind == 'year':
+            end = start.replace(year=start.year + 1)
+        elif kind == 'month':
+            days = calendar.monthrange(start.year, start.month)[1]
+            end = (start + timedelta(days=days)).replace(day=1)
+        else:
+            end = start + timedelta(days=1)
+        yield (timezone.make_aware(start), timezone.make_aware(end))
+        start = end
+
+
+class IndexedDatesQuerySet(QuerySet):
+    """QuerySet answering datetimes() with index range probes.
+
+    The admin date hierarchy lists years, months or days with a DISTINCT
+    over every matching row. With the field indexed, MIN/MAX plus one
+    EXISTS range probe per candidate period touches a few index entries
+    instead.
+    """
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None,
+                  **kwargs):
+        if kind not in ('year', 'month', 'day') or tzinfo is not None:
+            return super().datetimes(
+                field_name, kind, order=order, tzinfo=tzinfo, **kwargs)
+
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        if bounds['first'] is None:
+            return []
+        first = timezone.localtime(bounds['first']).replace(tzinfo=None)
+        last = timezone.localtime(bounds['last']).replace(tzinfo=None)
+        found = [
+            start for start, end in _periods(first, last, kind)
+            if self.filter(**{
+                f'{field_name}__gte': start,
+                f'{field_name}__lt': end,
+            }).exists()
+        ]
+        return found if order == 'ASC' else found[::-1]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables too big to count or scan.
+
+    Lists every row including soft deleted ones, so unfiltered pages can
+    use the estimated count.
+    """
+    paginator = EstimatedCountPaginator
+    # skip the second COUNT(*) of the unfiltered table when searching
+    show_full_result_count = False
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
 
 
 class UserAdmin(BaseUserAdmin):
     """Define the admin pages for users."""
     ordering = ['id']
     list_display = ['email', 'name']
+    actions = ['delete_in_batches']
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('name',)}),
@@ -43,11 +149,80 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    @admin.action(
+        description=_('Delete selected users in batches'),
+        permissions=['delete'],
+    )
+    def delete_in_batches(self, request, queryset):
+        """Delete users without loading their data into memory."""
+        for user in queryset:
+            self.log_deletion(request, user, str(user))
+            progress = {}
+            for label, deleted in delete_user(user):
+                progress[label] = deleted
+            summary = ', '.join(
+                f'{deleted} {label}' for label, deleted in progress.items())
+            self.message_user(
+                request,
+                _('Deleted %(email)s (%(summary)s).') % {
+                    'email': user.email, 'summary': summary},
+                messages.SUCCESS,
+            )
+
+
+class RecipeAdmin(LargeTableAdmin):
+    """Define the admin pages for recipes."""
+    list_display = ['id', 'title', 'user', 'time_minutes', 'price',
+                    'create_on', 'deleted_on']
+    autocomplete_fields = ['tags', 'ingredients']
+    # lookups served by indexes, not a LIKE '%x%' scan
+    search_fields = ['title__startswith', 'user__email__exact']
+    date_hierarchy = 'create_on'
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return IndexedDatesQuerySet(
+            model=queryset.model, query=queryset.query, using=queryset.db)
+
+
+class RecipeAttrAdmin(LargeTableAdmin):
+    """Define the admin pages for tags and ingredients."""
+    list_display = ['id', 'name', 'user', 'recipe_count', 'deleted_on']
+    search_fields = ['name__startswith', 'user__email__exact']
+    raw_id_fields = ['user', 'catalog']
+
+
+class CatalogAdmin(admin.ModelAdmin):
+    """Define the read only admin pages of the tag and ingredient catalogs.
+
+    Entries are created from user names and their ids are cached by
+    every process (recipe.catalog), so they can't be added, renamed or
+    deleted here.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ['name']
+    list_display = ['id', 'name']
+    search_fields = ['name__startswith']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 admin.site.register(models.User, UserAdmin)
 
-admin.site.register(models.Recipe)
+admin.site.register(models.Recipe, RecipeAdmin)
+
+admin.site.register(models.Tag, RecipeAttrAdmin)
+
+admin.site.register(models.Ingredient, RecipeAttrAdmin)
 
-admin.site.register(models.Tag)
+admin.site.register(models.CatalogTag, CatalogAdmin)
 
-admin.site.register(models.Ingredient)
+admin.site.register(models.CatalogIngredient, CatalogAdmin)
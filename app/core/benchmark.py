@@ -0,0 +1,190 @@
+"""
+Helpers for the recipe API load benchmark.
+
+Data is created by `manage.py seed_benchmark` and requests are driven
+by `manage.py benchmark` against a running server.
+"""
+import io
+import json
+import math
+import random
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from PIL import Image
+
+
+EMAIL_PREFIX = 'benchmark-'
+PASSWORD = 'benchmark-pass'
+
+FLOWS = ['list', 'filter', 'detail', 'create', 'update', 'upload']
+
+
+def user_email(index):
+    """Return email of the seeded benchmark user."""
+    return f'{EMAIL_PREFIX}{index}@example.com'
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """Return throughput and latency statistics (in ms) of one flow."""
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'throughput': round(count / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(latencies) / count * 1000, 2) if count else None,
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def compare(current, baseline):
+    """Return per-flow relative change (percent) against a baseline run."""
+    changes = {}
+    for flow, stats in current['flows'].items():
+        base = baseline.get('flows', {}).get(flow)
+        if not base:
+            continue
+        changes[flow] = {
+            key: _change(stats[key], base[key])
+            for key in ('throughput', 'p50_ms', 'p95_ms', 'p99_ms')
+        }
+    return changes
+
+
+def _change(value, base):
+    if not value or not base:
+        return None
+    return round((value - base) / base * 100, 1)
+
+
+class Client:
+    """Minimal HTTP client authenticated with a user token."""
+
+    def __init__(self, base_url, token):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+
+    def request(self, method, path, data=None, files=None):
+        """Send request and return status code."""
+        headers = {'Authorization': f'Token {self.token}'}
+        body = None
+        if files:
+            body, content_type = _encode_multipart(files)
+            headers['Content-Type'] = content_type
+        elif data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+
+        req = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as res:
+                res.read()
+                return res.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+
+def _encode_multipart(files):
+    """Encode files dict ({field: (filename, bytes)}) as multipart."""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for field, (filename, content) in files.items():
+        body.write(f'--{boundary}\r\n'.encode())
+        body.write(
+            f'Content-Disposition: form-data; name="{field}"; '
+            f'filename="{filename}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'.encode()
+        )
+        body.write(content)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def sample_image():
+    """Return bytes of a small JPEG image."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class Scenario:
+    """Requests of each flow for one seeded user."""
+
+    recipes_url = '/api/recipes/recipes/'
+
+    def __init__(self, client, recipe_ids, tag_ids, ingredient_ids, rng):
+        self.client = client
+        self.recipe_ids = recipe_ids
+        self.tag_ids = tag_ids
+        self.ingredient_ids = ingredient_ids
+        self.rng = rng
+        self.image = sample_image()
+
+    def _detail_url(self):
+        return f'{self.recipes_url}{self.rng.choice(self.recipe_ids)}/'
+
+    def list(self):
+        return self.client.request('GET', self.recipes_url)
+
+    def filter(self):
+        tag_ids = self.rng.sample(self.tag_ids, min(2, len(self.tag_ids)))
+        tags = ','.join(str(i) for i in tag_ids)
+        return self.client.request(
+            'GET', f'{self.recipes_url}?tags={tags}')
+
+    def detail(self):
+        return self.client.request('GET', self._detail_url())
+
+    def create(self):
+        return self.client.request('POST', self.recipes_url, data={
+            'title': 'Benchmark recipe',
+            'time_minutes': self.rng.randint(1, 240),
+            'price': '5.50',
+            'tags': [{'name': 'benchmark'}],
+            'ingredients': [{'name': 'salt'}],
+        })
+
+    def update(self):
+        return self.client.request('PATCH', self._detail_url(), data={
+            'title': 'Updated benchmark recipe',
+        })
+
+    def upload(self):
+        url = self._detail_url() + 'upload-image/'
+        return self.client.request(
+            'POST', url, files={'image': ('image.jpg', self.image)})
+
+
+def timed(func):
+    """Run func and return (latency in seconds, ok flag)."""
+    start = time.perf_counter()
+    try:
+        status = func()
+        ok = status < 400
+    except OSError:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def new_rng(seed, worker):
+    """Return deterministic random generator per worker."""
+    return random.Random(f'{seed}-{worker}')
@@ -0,0 +1,45 @@
+"""
+Helpers for compressing response bodies.
+"""
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, fall back to gzip only
+    brotli = None
+
+
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+# file suffix used when storing precompressed content on disk
+ENCODING_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+
+def available_encodings():
+    """Return supported encodings, preferred first."""
+    if brotli is not None:
+        return ['br', 'gzip']
+    return ['gzip']
+
+
+def accepted_encodings(request):
+    """Return the supported encodings accepted by the client."""
+    ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = []
+    for encoding in available_encodings():
+        regex = re_accepts_br if encoding == 'br' else re_accepts_gzip
+        if regex.search(ae):
+            accepted.append(encoding)
+    return accepted
+
+
+def compress(content, encoding):
+    """Compress bytes with the given encoding."""
+    if encoding == 'br':
+        return brotli.compress(content)
+    return compress_string(content)
@@ -0,0 +1,42 @@
+"""
+Password hashers with cost read from settings.
+
+Cost can be tuned per deployment without code changes. Django upgrades
+stored hashes on the next successful login when the cost changes
+(must_update compares the stored parameters with the current ones).
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with PASSWORD_PBKDF2_ITERATIONS iterations."""
+
+    @property
+    def iterations(self):
+        return (settings.PASSWORD_PBKDF2_ITERATIONS
+                or hashers.PBKDF2PasswordHasher.iterations)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 with PASSWORD_ARGON2_* cost, requires argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """Bcrypt with PASSWORD_BCRYPT_ROUNDS rounds, requires bcrypt."""
+
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
@@ -0,0 +1,106 @@
+"""
+Dependency checks for the readiness endpoint.
+"""
+import logging
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def check_database():
+    """Run a trivial query on the default database."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_media():
+    """Write and remove a temporary file in the media volume."""
+    with tempfile.NamedTemporaryFile(dir=settings.MEDIA_ROOT) as f:
+        f.write(b'ok')
+        f.flush()
+
+
+def check_cache():
+    """Round trip a value through the default cache."""
+    key = 'health-check'
+    cache.set(key, 'ok', timeout=5)
+    if cache.get(key) != 'ok':
+        raise RuntimeError('Cache returned unexpected value')
+
+
+CHECKS = {
+    'database': check_database,
+    'media': check_media,
+    'cache': check_cache,
+}
+
+# last result per process, shared between threads
+_lock = threading.Lock()
+_result = {'expires': 0, 'report': None, 'running': None}
+
+
+def run_checks():
+    """Run every check and return a report with latency in ms."""
+    report = {'healthy': True, 'checks': {}}
+    for name, check in CHECKS.items():
+        start = time.perf_counter()
+        try:
+            check()
+            status = {'healthy': True}
+        except Exception as exc:
+            logger.warning('health check %s failed: %s', name, exc)
+            status = {'healthy': False, 'error': str(exc)}
+            report['healthy'] = False
+        status['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        report['checks'][name] = status
+
+    return report
+
+
+def get_report():
+    """Return cached report, running the checks once the TTL expired.
+
+    Only one thread runs the checks, outside of the lock, so a burst of
+    probes costs a single round of queries per HEALTH_CHECK_TTL seconds.
+    Meanwhile the others get the expired report, or wait for the first.
+    """
+    with _lock:
+        report = _result['report']
+        if report is not None and time.monotonic() < _result['expires']:
+            return report
+        running = _result['running']
+        if running is None:
+            running = _result['running'] = threading.Event()
+            refresh = True
+        else:
+            refresh = False
+
+    if not refresh:
+        if report is not None:
+            return report
+        running.wait()
+        return _result['report'] or run_checks()
+
+    try:
+        report = run_checks()
+        with _lock:
+            _result['report'] = report
+            _result['expires'] = time.monotonic() + settings.HEALTH_CHECK_TTL
+    finally:
+        with _lock:
+            _result['running'] = None
+        running.set()
+    return report
+
+
+def clear_report():
+    """Drop the cached report."""
+    with _lock:
+        _result['report'] = None
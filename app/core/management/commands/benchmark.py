@@ -0,0 +1,123 @@
+"""
+Django command to load test the recipe API
+"""
+import json
+import subprocess
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import benchmark
+from core.models import AuthToken, Recipe
+
+
+class Command(BaseCommand):
+    """Django command to drive concurrent API flows and report latency.
+
+    Run `manage.py seed_benchmark` first and point --url at a running
+    server using the same database.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000',
+                            help='Base URL of the running API.')
+        parser.add_argument('--flows', default=','.join(benchmark.FLOWS),
+                            help='Comma separated flows to run.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per flow.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write results as JSON file.')
+        parser.add_argument('--compare',
+                            help='JSON results of a previous run to diff.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        flows = options['flows'].split(',')
+        unknown = set(flows) - set(benchmark.FLOWS)
+        if unknown:
+            raise CommandError(f'Unknown flows: {", ".join(sorted(unknown))}')
+
+        scenarios = self._scenarios(options)
+        results = {
+            'timestamp': timezone.now().isoformat(),
+            'commit': self._git_commit(),
+            'config': {
+                key: options[key]
+                for key in ('url', 'requests', 'concurrency', 'seed')
+            },
+            'flows': {},
+        }
+        for flow in flows:
+            stats = self._run_flow(flow, scenarios, options)
+            results['flows'][flow] = stats
+            self.stdout.write(
+                f"{flow:<8} {stats['throughput']:>8} req/s  "
+                f"p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  "
+                f"p99 {stats['p99_ms']}ms  errors {stats['errors']}"
+            )
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            results['compare'] = benchmark.compare(results, baseline)
+            for flow, change in results['compare'].items():
+                self.stdout.write(f'{flow:<8} vs baseline (%): {change}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"))
+
+    def _scenarios(self, options):
+        """Build one scenario per seeded user."""
+        users = get_user_model().objects.filter(
+            email__startswith=benchmark.EMAIL_PREFIX).order_by('id')
+        scenarios = []
+        for index, user in enumerate(users):
+            token = AuthToken.objects.create(user=user)
+            recipes = Recipe.objects.filter(user=user)
+            scenarios.append(benchmark.Scenario(
+                benchmark.Client(options['url'], token.key),
+                list(recipes.values_list('id', flat=True)),
+                list(user.tag_set.values_list('id', flat=True)),
+                list(user.ingredient_set.values_list('id', flat=True)),
+                benchmark.new_rng(options['seed'], index),
+            ))
+
+        if not scenarios or not all(s.recipe_ids for s in scenarios):
+            raise CommandError(
+                'No benchmark data found, run seed_benchmark first.')
+        return scenarios
+
+    def _run_flow(self, flow, scenarios, options):
+        """Send requests of one flow concurrently and summarize them."""
+        total = options['requests']
+
+        def send(i):
+            scenario = scenarios[i % len(scenarios)]
+            return benchmark.timed(getattr(scenario, flow))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(send, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, ok in results]
+        errors = sum(1 for latency, ok in results if not ok)
+        return benchmark.summarize(latencies, errors, elapsed)
+
+    def _git_commit(self):
+        """Return current commit so results can be compared by branch."""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,42 @@
+"""
+Django command to measure password check throughput per core
+"""
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to time password verification of each hasher.
+
+    Login cost is dominated by verifying the password hash, so checks per
+    second on one core is roughly the login capacity of one uWSGI worker.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2,
+                            help='Time spent per hasher.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        for hasher in get_hashers():
+            try:
+                encoded = hasher.encode('benchmark-pass', hasher.salt())
+            except ValueError as exc:
+                # library of optional hasher (argon2/bcrypt) not installed
+                self.stdout.write(f'{hasher.algorithm:<16} skipped: {exc}')
+                continue
+
+            checks = 0
+            start = time.perf_counter()
+            elapsed = 0
+            while elapsed < options['seconds']:
+                hasher.verify('benchmark-pass', encoded)
+                checks += 1
+                elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{hasher.algorithm:<16} {checks / elapsed:>10.1f} logins/s '
+                f'per core ({elapsed / checks * 1000:.1f}ms per check)'
+            )
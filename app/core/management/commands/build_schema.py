@@ -0,0 +1,42 @@
+"""
+Django command to pre-generate the OpenAPI schema
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import compression
+from core.schema import generate_schema
+
+
+class Command(BaseCommand):
+    """Django command to write the schema and its compressed variants."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=settings.SCHEMA_FILE,
+            help='Path of the generated schema file.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options['file']
+        content = generate_schema()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._write(path, content)
+        # store every supported encoding so the view never compress on request
+        for encoding in compression.available_encodings():
+            suffix = compression.ENCODING_SUFFIXES[encoding]
+            self._write(path + suffix, compression.compress(content, encoding))
+
+        self.stdout.write(self.style.SUCCESS(f'Schema written to {path}'))
+
+    def _write(self, path, content):
+        """Write file atomically so running workers never read half a file."""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,28 @@
+"""
+Django command to delete users with large collections in batches
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from user.deletion import delete_user
+
+
+class Command(BaseCommand):
+    """Django command to delete users and their data in small batches."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('emails', nargs='+')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        users = get_user_model().objects.filter(email__in=options['emails'])
+        missing = set(options['emails']) - {user.email for user in users}
+        if missing:
+            raise CommandError(f'Unknown users: {", ".join(sorted(missing))}')
+
+        for user in users:
+            self.stdout.write(f'Deleting {user.email}...')
+            for label, deleted in delete_user(user, options['batch_size']):
+                self.stdout.write(f'  {deleted} {label}')
+            self.stdout.write(self.style.SUCCESS(f'Deleted {user.email}.'))
@@ -0,0 +1,56 @@
+"""
+Django command to purge soft deleted recipes, tags and ingredients
+"""
+import time
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.deletion import purge_model, purge_tombstones
+
+
+class Command(BaseCommand):
+    """Django command to hard delete soft deleted rows in small batches.
+
+    Runs once by default, with --loop it keeps running as a background
+    worker purging every --interval seconds.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running as a worker.')
+        parser.add_argument('--interval', type=float, default=60,
+                            help='Seconds between runs with --loop.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        while True:
+            self.purge(options['batch_size'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def purge(self, batch_size):
+        now = timezone.now()
+        before = now - timedelta(seconds=settings.PURGE_DELETED_AFTER)
+        # recipes first so tags and ingredients have fewer links left
+        for model in (Recipe, Tag, Ingredient):
+            purged = 0
+            for count in purge_model(model, before, batch_size):
+                purged += count
+                self.stdout.write(
+                    f'Purged {purged} {model._meta.verbose_name_plural}...')
+            if purged:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Purged {purged} {model._meta.verbose_name_plural}.'))
+
+        before = now - timedelta(seconds=settings.TOMBSTONE_TTL)
+        purged = sum(purge_tombstones(before, batch_size))
+        if purged:
+            self.stdout.write(self.style.SUCCESS(
+                f'Purged {purged} tombstones.'))
@@ -0,0 +1,42 @@
+"""
+Django command to delete expired API tokens
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import AuthToken
+
+
+class Command(BaseCommand):
+    """Django command to purge expired tokens in small batches."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Seconds to pause between batches to limit load.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        now = timezone.now()
+        expired = AuthToken.objects.filter(expires__lte=now)
+        deleted = 0
+        while True:
+            # short transactions, uses the index on expires
+            ids = list(expired.values_list('id', flat=True)[
+                :options['batch_size']])
+            if not ids:
+                break
+            AuthToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f'Deleted {deleted} expired tokens...')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {deleted} expired tokens.'))
@@ -0,0 +1,122 @@
+"""
+Django command to seed the database with benchmark data
+"""
+import random
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Recipe, Tag, Ingredient
+from core import benchmark
+from recipe.catalog import link_catalog
+
+
+class Command(BaseCommand):
+    """Django command to create users with recipes, tags and ingredients."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes', type=int, default=100,
+                            help='Recipes per user.')
+        parser.add_argument('--tags', type=int, default=20,
+                            help='Tags per user.')
+        parser.add_argument('--ingredients', type=int, default=50,
+                            help='Ingredients per user.')
+        parser.add_argument('--per-recipe', type=int, default=3,
+                            help='Tags and ingredients linked per recipe.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed, same seed gives same data.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        User = get_user_model()
+
+        # remove data of a previous run so volumes are exact
+        User.objects.filter(
+            email__startswith=benchmark.EMAIL_PREFIX).delete()
+
+        # hash once, hashing per user would dominate seeding time
+        password = make_password(benchmark.PASSWORD)
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    email=benchmark.user_email(i),
+                    name=f'Benchmark user {i}',
+                    password=password,
+                )
+                for i in range(options['users'])
+            ], batch_size=batch_size)
+            # bulk_create only returns pks on postgres, refetch to be safe
+            users = list(User.objects.filter(
+                email__startswith=benchmark.EMAIL_PREFIX).order_by('id'))
+
+            for user in users:
+                self._seed_user(user, rng, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users with {options['recipes']} recipes, "
+            f"{options['tags']} tags, {options['ingredients']} ingredients"
+        ))
+
+    def _seed_user(self, user, rng, options):
+        """Create recipes, tags and ingredients of one user."""
+        batch_size = options['batch_size']
+        per_recipe = options['per_recipe']
+
+        Tag.objects.bulk_create([
+            Tag(user=user, name=f'tag {i}')
+            for i in range(options['tags'])
+        ], batch_size=batch_size)
+        Ingredient.objects.bulk_create([
+            Ingredient(user=user, name=f'ingredient {i}')
+            for i in range(options['ingredients'])
+        ], batch_size=batch_size)
+        Recipe.objects.bulk_create([
+            Recipe(
+                user=user,
+                title=f'Recipe {i}',
+                description='Benchmark recipe',
+                time_minutes=rng.randint(1, 240),
+                price=Decimal(rng.randint(100, 9999)) / 100,
+            )
+            for i in range(options['recipes'])
+        ], batch_size=batch_size)
+
+        tag_ids = list(
+            Tag.objects.filter(user=user).values_list('id', flat=True))
+        ingredient_ids = list(
+            Ingredient.objects.filter(user=user).values_list('id', flat=True))
+        recipe_ids = list(
+            Recipe.objects.filter(user=user).values_list('id', flat=True))
+
+        # link M2M rows directly through the auto-created tables
+        recipe_tags = []
+        recipe_ingredients = []
+        for recipe_id in recipe_ids:
+            for tag_id in rng.sample(tag_ids, min(per_recipe, len(tag_ids))):
+                recipe_tags.append(Recipe.tags.through(
+                    recipe_id=recipe_id, tag_id=tag_id))
+            for ingredient_id in rng.sample(
+                    ingredient_ids, min(per_recipe, len(ingredient_ids))):
+                recipe_ingredients.append(Recipe.ingredients.through(
+                    recipe_id=recipe_id, ingredient_id=ingredient_id))
+        Recipe.tags.through.objects.bulk_create(
+            recipe_tags, batch_size=batch_size)
+        Recipe.ingredients.through.objects.bulk_create(
+            recipe_ingredients, batch_size=batch_size)
+        # bulk_create sends no m2m_changed, count in one UPDATE each
+        Tag.objects.filter(user=user).refresh_recipe_counts()
+        Ingredient.objects.filter(user=user).refresh_recipe_counts()
+        # nor pre_save, link names to the catalog in batches
+        for model in (Tag, Ingredient):
+            for _ in link_catalog(
+                    model.objects.filter(user=user), batch_size):
+                pass
@@ -0,0 +1,52 @@
+"""
+Django command to update the recipe similarity index
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+from recipe.similarity import index_recipes, stale_recipes
+
+
+class Command(BaseCommand):
+    """Django command to index recipes changed since the last run.
+
+    With --rebuild every recipe is reindexed. Runs once by default, with
+    --loop it keeps running as a background worker.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Reindex every recipe.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running as a worker.')
+        parser.add_argument('--interval', type=float, default=60,
+                            help='Seconds between runs with --loop.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['rebuild']:
+            self.index(Recipe.all_objects.all(), options['batch_size'])
+        while True:
+            self.index(stale_recipes(), options['batch_size'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def index(self, recipes, batch_size):
+        # keyset over ids, recipes edited meanwhile wait for the next run
+        last_id = 0
+        indexed = 0
+        while True:
+            ids = list(recipes.filter(id__gt=last_id).order_by(
+                'id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            indexed += index_recipes(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'Indexed {indexed} recipes...')
+        if indexed:
+            self.stdout.write(self.style.SUCCESS(
+                f'Indexed {indexed} recipes.'))
@@ -1,27 +1,116 @@
 """
 Django command to wait for db ready
 """
+import math
+import random
 import time
 
+from concurrent.futures import ThreadPoolExecutor
+
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django command to wait for database."""
 
+    # backoff for --fast mode, in seconds
+    initial_delay = 0.05
+    max_delay = 2
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            action='append',
+            dest='databases',
+            help='Database alias to wait for, can be repeated.',
+        )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Probe raw connections with exponential backoff instead '
+                 'of running system checks every 2 seconds.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=None,
+            help='Give up after this many seconds (default: wait forever).',
+        )
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
+        databases = options['databases'] or ['default']
+        timeout = options['timeout']
+        start = time.monotonic()
+
         self.stdout.write('Waiting for database...')
-        db_up = False
-        while db_up is False:
+        if options['fast']:
+            # wait on every alias at the same time
+            with ThreadPoolExecutor(max_workers=len(databases)) as executor:
+                results = executor.map(
+                    lambda alias: self._probe(alias, start, timeout),
+                    databases,
+                )
+                for alias, attempts, elapsed in results:
+                    self.stdout.write(
+                        f'Database {alias!r} available after '
+                        f'{elapsed:.3f}s ({attempts} attempts)'
+                    )
+        else:
+            db_up = False
+            while db_up is False:
+                try:
+                    self.check(databases=databases)
+                    db_up = True
+                except (Psycopg2OpError, OperationalError):
+                    self._check_timeout(start, timeout)
+                    self.stdout.write(
+                        'Database unavailable, waiting 2 second...')
+                    time.sleep(2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Database available! ({time.monotonic() - start:.3f}s)'
+        ))
+
+    def _probe(self, alias, start, timeout):
+        """Open a connection to alias until it succeeds.
+
+        Sleeps with full jitter exponential backoff between attempts.
+        Returns alias, number of attempts and seconds spent.
+        """
+        connection = connections[alias]
+        options = connection.settings_dict.get('OPTIONS', {})
+        attempts = 0
+        delay = self.initial_delay
+        while True:
+            attempts += 1
             try:
-                self.check(databases=['default'])
-                db_up = True
+                if timeout is not None and connection.vendor == 'postgresql':
+                    # an unreachable host must not block past the timeout
+                    remaining = timeout - (time.monotonic() - start)
+                    connection.settings_dict['OPTIONS'] = {
+                        **options,
+                        'connect_timeout': max(1, math.ceil(remaining)),
+                    }
+                connection.ensure_connection()
+                break
             except (Psycopg2OpError, OperationalError):
-                self.stdout.write('Database unavailable, waiting 2 second...')
-                time.sleep(2)
+                self._check_timeout(start, timeout)
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * 2, self.max_delay)
+            finally:
+                connection.settings_dict['OPTIONS'] = options
+
+        # connection belongs to the worker thread, don't leak it
+        connection.close()
+        return alias, attempts, time.monotonic() - start
 
-        self.stdout.write(self.style.SUCCESS('Database available!'))
+    def _check_timeout(self, start, timeout):
+        """Raise CommandError once timeout is exceeded."""
+        if timeout is not None and time.monotonic() - start >= timeout:
+            raise CommandError(
+                f'Database unavailable after {timeout} seconds.')
@@ -0,0 +1,106 @@
+"""
+Prometheus metrics for app.
+
+When PROMETHEUS_MULTIPROC_DIR is set (see scripts/run.sh) every uWSGI
+worker writes its values to files in that directory and the metrics view
+aggregates them, so any worker can answer a scrape. Files of exited
+workers are released by mark_process_dead (see app/wsgi.py).
+"""
+import os
+import weakref
+from collections import defaultdict
+
+from django.db.backends.signals import connection_created
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by route.',
+    ['method', 'route'],
+)
+REQUESTS = Counter(
+    'http_requests_total',
+    'Requests by route and status code.',
+    ['method', 'route', 'status'],
+)
+ERRORS = Counter(
+    'http_request_errors_total',
+    'Requests answered with a 5xx or raising an exception.',
+    ['method', 'route'],
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request',
+    'SQL queries executed per request.',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_CONNECTIONS = Gauge(
+    'db_connections_open',
+    'Open database connections of all threads and workers by alias.',
+    ['alias'],
+    multiprocess_mode='livesum',
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'db_connections_opened_total',
+    'Database connections opened by alias, a rate near the request '
+    'rate means connections are not reused.',
+    ['alias'],
+)
+IMAGE_UPLOAD_SIZE = Histogram(
+    'recipe_image_upload_bytes',
+    'Size of uploaded recipe images.',
+    buckets=(
+        16 * 1024, 64 * 1024, 256 * 1024,
+        1024 * 1024, 4 * 1024 * 1024, 10 * 1024 * 1024,
+    ),
+)
+
+
+# connection wrappers of every thread of this process, a wrapper leaves
+# the set with its thread
+_wrappers = defaultdict(weakref.WeakSet)
+
+
+def _connection_created(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+    _wrappers[connection.alias].add(connection)
+
+
+connection_created.connect(_connection_created)
+
+
+def observe_connections():
+    """Set the open connections gauge of this process."""
+    for alias, wrappers in _wrappers.items():
+        DB_CONNECTIONS.labels(alias).set(sum(
+            wrapper.connection is not None for wrapper in list(wrappers)))
+
+
+def mark_process_dead(pid=None):
+    """Drop the live gauges of an exited worker process."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def get_registry():
+    """Return registry aggregating all worker processes if configured."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest():
+    """Return metrics in Prometheus text format."""
+    return generate_latest(get_registry())
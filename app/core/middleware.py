@@ -0,0 +1,180 @@
+"""
+Middleware for app.
+"""
+import logging
+import time
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from core import compression, metrics, timing
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress text/JSON responses above a size threshold.
+
+    Uses brotli when installed and accepted by the client, gzip otherwise.
+    Streaming responses (file downloads, images) are passed through as is.
+    """
+
+    def process_response(self, request, response):
+        # streaming body can't be measured without reading it
+        if response.streaming:
+            return response
+
+        # already compressed (e.g. precompressed schema)
+        if response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+
+        # not worth compressing small payload
+        if len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encodings = compression.accepted_encodings(request)
+        if not encodings:
+            return response
+
+        encoding = encodings[0]
+        compressed_content = compression.compress(response.content, encoding)
+        # return the compressed content only if it's actually shorter
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+
+        # compressed body is no longer byte-identical, weaken strong ETag
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+
+        return response
+
+
+class RequestTimingMiddleware:
+    """Record query count and DB/serializer/render/total time per request.
+
+    Enabled with the REQUEST_TIMING setting, otherwise Django drops the
+    middleware at startup so disabled instrumentation costs nothing.
+    Timings are sent in the Server-Timing header and logged.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        record, token = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            timing.stop(token)
+        total = time.perf_counter() - start
+
+        durations = dict(record.durations, total=total)
+        metrics = []
+        for name, duration in durations.items():
+            metric = f'{name};dur={duration * 1000:.2f}'
+            if name == 'db':
+                metric += f';desc="{record.query_count} queries"'
+            metrics.append(metric)
+        response.headers['Server-Timing'] = ', '.join(metrics)
+        logger.info(
+            'request timing %s %s status=%s queries=%s %s',
+            request.method,
+            request.path,
+            response.status_code,
+            record.query_count,
+            ' '.join(f'{name}_ms={duration * 1000:.2f}'
+                     for name, duration in durations.items()),
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': record.query_count,
+                'timings_ms': {
+                    name: round(duration * 1000, 2)
+                    for name, duration in durations.items()
+                },
+            },
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """Time rendering of DRF/template responses."""
+        record = timing.current()
+        start = time.perf_counter()
+
+        def finish(response):
+            record.add('render', time.perf_counter() - start)
+
+        response.add_post_render_callback(finish)
+        return response
+
+
+class MetricsMiddleware:
+    """Collect Prometheus request, error and DB metrics per route.
+
+    Routes are labelled with the URL name (e.g. recipe:recipe-detail)
+    to keep label cardinality bounded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(count_queries))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self._observe(request, status, query_count,
+                          time.perf_counter() - start)
+
+    def _observe(self, request, status, query_count, duration):
+        """Record metrics of a finished request."""
+        match = request.resolver_match
+        route = match.view_name if match else '<unmatched>'
+        method = request.method
+
+        metrics.REQUEST_LATENCY.labels(method, route).observe(duration)
+        metrics.REQUESTS.labels(method, route, status).inc()
+        if status >= 500:
+            metrics.ERRORS.labels(method, route).inc()
+        metrics.DB_QUERIES.labels(route).observe(query_count)
+        metrics.observe_connections()
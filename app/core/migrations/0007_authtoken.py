@@ -0,0 +1,44 @@
+# Generated by Django 4.0.10 on 2026-10-19 11:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def copy_drf_tokens(apps, schema_editor):
+    """Keep existing rest_framework tokens valid for one TOKEN_TTL."""
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('core', 'AuthToken')
+    expires = timezone.now() + settings.TOKEN_TTL
+    batch = []
+    for token in Token.objects.iterator(chunk_size=1000):
+        batch.append(AuthToken(
+            key=token.key, user_id=token.user_id, expires=expires))
+        if len(batch) >= 1000:
+            AuthToken.objects.bulk_create(batch)
+            batch = []
+    AuthToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_rename_time_munites_recipe_time_minutes'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('last_used', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_drf_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0.10 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+def count_recipes(apps, schema_editor):
+    """Fill recipe_count of existing tags and ingredients."""
+    for model_name in ('Tag', 'Ingredient'):
+        model = apps.get_model('core', model_name)
+        counts = model.objects.filter(pk=models.OuterRef('pk')).annotate(
+            n=models.Count('recipe')).values('n')
+        model.objects.update(recipe_count=models.Subquery(counts))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_authtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'recipe_count'], name='core_ingred_user_id_de1121_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'recipe_count'], name='core_tag_user_id_699afc_idx'),
+        ),
+        migrations.RunPython(count_recipes, migrations.RunPython.noop),
+    ]
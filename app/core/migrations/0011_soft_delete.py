@@ -0,0 +1,44 @@
+# Generated by Django 4.0.10 on 2026-10-19 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='ingredient_deleted_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='recipe_deleted_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='tag_deleted_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_on'], name='core_tombst_deleted_f926e7_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='is_public',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True), ('is_public', True)), fields=['-update_on', '-id'], name='recipe_public_feed_idx'),
+        ),
+    ]
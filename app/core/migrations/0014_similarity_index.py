@@ -0,0 +1,47 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_public_recipes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.SmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='similarity_indexed_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('similarity_indexed_on__isnull', True), ('similarity_indexed_on__lt', django.db.models.expressions.F('update_on')), _connector='OR'), fields=['update_on'], name='recipe_similarity_stale_idx'),
+        ),
+        migrations.AddField(
+            model_name='recipeband',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_bands', to='core.recipe'),
+        ),
+        migrations.AddField(
+            model_name='recipeband',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='recipeband',
+            index=models.Index(fields=['user', 'band', 'bucket'], name='core_recipe_user_id_0d1ef4_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_similarity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CatalogTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='catalogtag',
+            index=models.Index(fields=['name'], name='catalogtag_name_like_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='catalogingredient',
+            index=models.Index(fields=['name'], name='catalogingr_name_like_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='catalog',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aliases', to='core.catalogingredient'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='catalog',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aliases', to='core.catalogtag'),
+        ),
+    ]
@@ -0,0 +1,114 @@
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def normalize(name):
+    # frozen copy of recipe.catalog.normalize
+    return ' '.join(name.split()).lower()[:255]
+
+
+def link_catalog(model, catalog):
+    """Create catalog entries and link rows to them, batch by batch."""
+    unlinked = model.objects.filter(catalog__isnull=True)
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(unlinked.filter(id__gt=last_id).order_by(
+                'id').values_list('id', 'name')[:BATCH_SIZE])
+            if not rows:
+                return
+            names = {normalize(name) for _, name in rows}
+            catalog.objects.bulk_create(
+                [catalog(name=name) for name in names],
+                ignore_conflicts=True)
+            ids = dict(catalog.objects.filter(
+                name__in=names).values_list('name', 'id'))
+            by_catalog = {}
+            for row_id, name in rows:
+                by_catalog.setdefault(
+                    ids[normalize(name)], []).append(row_id)
+            for catalog_id, row_ids in by_catalog.items():
+                model.objects.filter(id__in=row_ids).update(
+                    catalog_id=catalog_id)
+        last_id = rows[-1][0]
+
+
+def merge_group(model, recipe, through, column, tombstone, kind, group):
+    """Move links of a user's duplicate rows to the oldest, delete them."""
+    keep = group['keep']
+    duplicates = list(model.objects.filter(
+        user_id=group['user_id'],
+        catalog_id=group['catalog_id'],
+        deleted_on__isnull=True,
+    ).exclude(id=keep).values_list('id', flat=True))
+    links = through.objects.filter(**{f'{column}__in': duplicates})
+    recipe_ids = set(links.values_list('recipe_id', flat=True))
+    linked = set(through.objects.filter(
+        **{column: keep}).values_list('recipe_id', flat=True))
+
+    links.delete()
+    through.objects.bulk_create([
+        through(recipe_id=recipe_id, **{column: keep})
+        for recipe_id in recipe_ids - linked
+    ])
+    model.objects.filter(id__in=duplicates).delete()
+    # delta sync clients drop the duplicates and refetch the recipes
+    tombstone.objects.bulk_create([
+        tombstone(user_id=group['user_id'], kind=kind, object_id=duplicate)
+        for duplicate in duplicates
+    ])
+    now = timezone.now()
+    # live recipes only, like soft_delete keeps the counts
+    count = through.objects.filter(
+        **{column: keep}, recipe__deleted_on__isnull=True).count()
+    model.objects.filter(id=keep).update(recipe_count=count, update_on=now)
+    recipe.objects.filter(id__in=recipe_ids).update(update_on=now)
+
+
+def merge_duplicates(model, recipe, through, column, tombstone, kind):
+    """Merge live rows of a user sharing a catalog entry, batch by batch."""
+    groups = model.objects.filter(deleted_on__isnull=True).values(
+        'user_id', 'catalog_id',
+    ).annotate(
+        keep=models.Min('id'), rows=models.Count('id'),
+    ).filter(rows__gt=1).order_by('user_id', 'catalog_id')
+    while True:
+        # merged groups drop out, so the next batch is the first again
+        with transaction.atomic():
+            batch = list(groups[:BATCH_SIZE])
+            if not batch:
+                return
+            for group in batch:
+                merge_group(
+                    model, recipe, through, column, tombstone, kind, group)
+
+
+def build_catalog(apps, schema_editor):
+    """Link tags/ingredients to the catalog and merge duplicates."""
+    Recipe = apps.get_model('core', 'Recipe')
+    Tombstone = apps.get_model('core', 'Tombstone')
+    for model_name, catalog_name, field, kind in (
+        ('Tag', 'CatalogTag', 'tags', 'tag'),
+        ('Ingredient', 'CatalogIngredient', 'ingredients', 'ingredient'),
+    ):
+        model = apps.get_model('core', model_name)
+        catalog = apps.get_model('core', catalog_name)
+        through = Recipe._meta.get_field(field).remote_field.through
+        column = f'{model_name.lower()}_id'
+        link_catalog(model, catalog)
+        merge_duplicates(model, Recipe, through, column, Tombstone, kind)
+
+
+class Migration(migrations.Migration):
+    # every batch commits on its own, an interrupted run resumes
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_catalog, migrations.RunPython.noop),
+    ]
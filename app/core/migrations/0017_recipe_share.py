@@ -0,0 +1,28 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_catalog_dedupe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeShare',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('create_on', models.DateTimeField(auto_now_add=True)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shares', to='core.recipe')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='received_shares', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recipeshare',
+            constraint=models.UniqueConstraint(fields=('recipient', 'recipe'), name='unique_recipe_share'),
+        ),
+    ]
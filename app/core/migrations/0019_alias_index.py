@@ -0,0 +1,21 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_catalog_protect'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'catalog'], name='core_ingred_user_id_2047ab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'catalog'], name='core_tag_user_id_de4ebc_idx'),
+        ),
+    ]
@@ -1,11 +1,13 @@
 """
 Database models.
 """
+import binascii
 import uuid
 import os
 
-from django.conf import Settings
+from django.conf import Settings, settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -61,6 +63,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class SoftDeleteManager(models.Manager):
+    """Manager hiding soft deleted rows, see recipe.deletion."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_on__isnull=True)
+
+
 class Recipe(models.Model):
     """Recipe models object."""
     user = models.ForeignKey(
@@ -87,9 +96,126 @@ class Recipe(models.Model):
     # arguments for setting heigt and weight of images maxlength
     # height_field=None, width_field=None, max_length=None)
 
+    # shared on the public feed (recipe.public)
+    is_public = models.BooleanField(default=False)
+
+    # when the similarity index last saw the recipe (recipe.similarity),
+    # older than update_on means the index is stale
+    similarity_indexed_on = models.DateTimeField(null=True, blank=True)
+
+    # set by a soft delete, the row is removed later by purge_deleted
+    deleted_on = models.DateTimeField(null=True, blank=True)
+
+    # soft deleted recipes are hidden, all_objects includes them
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # user leading so every filter/sort of the list stays per user
+        indexes = [
+            models.Index(fields=['user', 'time_minutes']),
+            models.Index(fields=['user', 'price']),
+            models.Index(fields=['user', 'create_on']),
+            models.Index(fields=['user', 'update_on']),
+            models.Index(
+                fields=['deleted_on'],
+                name='recipe_deleted_on_idx',
+                condition=models.Q(deleted_on__isnull=False),
+            ),
+            # admin: prefix search (LIKE 'x%') and date hierarchy bounds
+            models.Index(
+                fields=['title'],
+                name='recipe_title_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+            models.Index(fields=['create_on'], name='recipe_create_on_idx'),
+            # public feed, newest first, only shared live recipes
+            models.Index(
+                fields=['-update_on', '-id'],
+                name='recipe_public_feed_idx',
+                condition=models.Q(is_public=True, deleted_on__isnull=True),
+            ),
+            # recipes waiting for update_similarity, small when caught up
+            models.Index(
+                fields=['update_on'],
+                name='recipe_similarity_stale_idx',
+                condition=(
+                    models.Q(similarity_indexed_on__isnull=True)
+                    | models.Q(similarity_indexed_on__lt=models.F('update_on'))
+                ),
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so un-sharing a recipe can drop the public caches
+        instance._was_public = instance.__dict__.get('is_public', False)
+        return instance
+
+
+class RecipeAttrQuerySet(models.QuerySet):
+    """QuerySet of tags or ingredients."""
+
+    def refresh_recipe_counts(self):
+        """Recompute recipe_count from the M2M table.
+
+        Counts are kept up to date by recipe.signals, this repairs them
+        after writes that skip signals (bulk_create of M2M rows, raw SQL).
+        Like soft_delete, only live recipes are counted.
+        """
+        counts = self.model.all_objects.filter(
+            pk=models.OuterRef('pk'),
+        ).annotate(n=models.Count(
+            'recipe', filter=models.Q(recipe__deleted_on__isnull=True),
+        )).values('n')
+        return self.update(recipe_count=models.Subquery(counts))
+
+
+RecipeAttrManager = SoftDeleteManager.from_queryset(RecipeAttrQuerySet)
+
+
+class CatalogTag(models.Model):
+    """Canonical tag, user tags of the same name are its aliases."""
+    # normalized by recipe.catalog.normalize
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        indexes = [
+            # prefix search (LIKE 'x%')
+            models.Index(
+                fields=['name'],
+                name='catalogtag_name_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CatalogIngredient(models.Model):
+    """Canonical ingredient, user ingredients of the same name are its
+    aliases."""
+    # normalized by recipe.catalog.normalize
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        indexes = [
+            # prefix search (LIKE 'x%')
+            models.Index(
+                fields=['name'],
+                name='catalogingr_name_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
 
 class Tag (models.Model):
     """Tag for filtering recipe."""
@@ -98,6 +224,43 @@ class Tag (models.Model):
         User,
         on_delete=models.CASCADE,
     )
+    # the user's name is an alias of this entry, set by recipe.signals
+    catalog = models.ForeignKey(
+        CatalogTag,
+        related_name='aliases',
+        null=True,
+        blank=True,
+        # ids are cached by name (recipe.catalog), entries stay forever
+        on_delete=models.PROTECT,
+    )
+    # number of recipes using the tag, maintained by recipe.signals
+    recipe_count = models.PositiveIntegerField(default=0)
+    update_on = models.DateTimeField(auto_now=True)
+    # set by a soft delete, the row is removed later by purge_deleted
+    deleted_on = models.DateTimeField(null=True, blank=True)
+
+    objects = RecipeAttrManager()
+    all_objects = RecipeAttrQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'recipe_count']),
+            # delta sync
+            models.Index(fields=['user', 'update_on']),
+            models.Index(
+                fields=['deleted_on'],
+                name='tag_deleted_on_idx',
+                condition=models.Q(deleted_on__isnull=False),
+            ),
+            # admin prefix search and autocomplete (LIKE 'x%')
+            models.Index(
+                fields=['name'],
+                name='tag_name_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+            # the user's row of a catalog entry (get_or_create_alias)
+            models.Index(fields=['user', 'catalog']),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -110,6 +273,161 @@ class Ingredient(models.Model):
         User,
         on_delete=models.CASCADE,
     )
+    # the user's name is an alias of this entry, set by recipe.signals
+    catalog = models.ForeignKey(
+        CatalogIngredient,
+        related_name='aliases',
+        null=True,
+        blank=True,
+        # ids are cached by name (recipe.catalog), entries stay forever
+        on_delete=models.PROTECT,
+    )
+    # number of recipes using the ingredient, maintained by recipe.signals
+    recipe_count = models.PositiveIntegerField(default=0)
+    update_on = models.DateTimeField(auto_now=True)
+    # set by a soft delete, the row is removed later by purge_deleted
+    deleted_on = models.DateTimeField(null=True, blank=True)
+
+    objects = RecipeAttrManager()
+    all_objects = RecipeAttrQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'recipe_count']),
+            # delta sync
+            models.Index(fields=['user', 'update_on']),
+            models.Index(
+                fields=['deleted_on'],
+                name='ingredient_deleted_on_idx',
+                condition=models.Q(deleted_on__isnull=False),
+            ),
+            # admin prefix search and autocomplete (LIKE 'x%')
+            models.Index(
+                fields=['name'],
+                name='ingredient_name_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+            # the user's row of a catalog entry (get_or_create_alias)
+            models.Index(fields=['user', 'catalog']),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class Tombstone(models.Model):
+    """Record of a deleted recipe, tag or ingredient for delta sync."""
+    RECIPE = 'recipe'
+    TAG = 'tag'
+    INGREDIENT = 'ingredient'
+    KIND_CHOICES = [
+        (RECIPE, 'Recipe'),
+        (TAG, 'Tag'),
+        (INGREDIENT, 'Ingredient'),
+    ]
+
+    # no FK constraint, tombstones written while a user is deleted
+    # outlive it and are removed with the other expired tombstones
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_on']),
+            # purge of expired tombstones
+            models.Index(fields=['deleted_on']),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.kind} {self.object_id}'
+
+
+class RecipeShare(models.Model):
+    """Recipe offered to another user, copied once they accept."""
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name='shares',
+        on_delete=models.CASCADE,
+    )
+    recipient = models.ForeignKey(
+        User,
+        related_name='received_shares',
+        on_delete=models.CASCADE,
+    )
+    create_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # sharing again doesn't pile up offers
+            models.UniqueConstraint(
+                fields=['recipient', 'recipe'],
+                name='unique_recipe_share',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipe_id} to {self.recipient_id}'
+
+
+class RecipeBand(models.Model):
+    """LSH bucket of a recipe's MinHash signature in one band.
+
+    Recipes sharing a bucket in any band are similarity candidates,
+    see recipe.similarity.
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name='similarity_bands',
+        on_delete=models.CASCADE,
+    )
+    # denormalized so lookups stay within the user's recipes
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'band', 'bucket']),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipe_id} {self.band}:{self.bucket}'
+
+
+class AuthToken(models.Model):
+    """Expiring API token, a user can hold several (one per login)."""
+    key = models.CharField(max_length=40, unique=True)
+    user = models.ForeignKey(
+        User,
+        related_name='auth_tokens',
+        on_delete=models.CASCADE,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    # indexed for purge_tokens
+    expires = models.DateTimeField(db_index=True)
+    # written in batches by user.authentication, may lag behind
+    last_used = models.DateTimeField(null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = self.generate_key()
+        if not self.expires:
+            self.expires = timezone.now() + settings.TOKEN_TTL
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def generate_key(cls):
+        return binascii.hexlify(os.urandom(20)).decode()
+
+    @property
+    def is_expired(self):
+        return self.expires <= timezone.now()
+
+    def __str__(self) -> str:
+        return self.key
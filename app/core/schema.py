@@ -0,0 +1,97 @@
+"""
+Pre-generated OpenAPI schema kept in memory.
+"""
+import hashlib
+import os
+
+from drf_spectacular.renderers import OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.http import quote_etag
+
+from core import compression
+
+
+# {(format, language): variants}, loaded once per process, see load_schema()
+_cache = {}
+
+
+def generate_schema(renderer=None, lang=None):
+    """Introspect the API and return the schema as bytes, YAML by default."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    if lang:
+        with translation.override(lang):
+            schema = generator.get_schema(request=None, public=True)
+    else:
+        schema = generator.get_schema(request=None, public=True)
+    renderer = renderer or OpenApiYamlRenderer()
+    return renderer.render(schema, renderer_context={})
+
+
+def language_key(lang):
+    """Return the supported language of a lang parameter, None for none.
+
+    Unknown codes share the default entry instead of adding their own.
+    """
+    if not lang or not settings.USE_I18N:
+        return None
+    try:
+        return translation.get_supported_language_variant(lang)
+    except LookupError:
+        return None
+
+
+def _read_file(path):
+    """Return file content or None when it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def load_schema(renderer=None, lang=None):
+    """Return schema variants keyed by encoding (None for identity).
+
+    Variants are kept per renderer format and language. The default YAML
+    schema is read from the files written by build_schema, generated only
+    when they are missing, the others are generated on first use. Results
+    are kept for the lifetime of the process so the schema is rebuilt on
+    deploy/restart only.
+    """
+    renderer = renderer or OpenApiYamlRenderer()
+    key = (renderer.format, lang)
+    if key in _cache:
+        return _cache[key]
+
+    content = None
+    if key == ('yaml', None):
+        content = _read_file(settings.SCHEMA_FILE)
+    from_file = content is not None
+    if not from_file:
+        content = generate_schema(renderer, lang)
+
+    variants = {None: content}
+    for encoding in compression.available_encodings():
+        suffix = compression.ENCODING_SUFFIXES[encoding]
+        compressed = None
+        if from_file:
+            compressed = _read_file(settings.SCHEMA_FILE + suffix)
+        if compressed is None:
+            compressed = compression.compress(content, encoding)
+        variants[encoding] = compressed
+
+    # each encoding is a different representation, so needs its own ETag
+    digest = hashlib.sha1(content).hexdigest()
+    _cache[key] = {
+        encoding: (body, quote_etag(f'{digest}-{encoding}' if encoding
+                                    else digest))
+        for encoding, body in variants.items()
+    }
+    return _cache[key]
+
+
+def clear_cache():
+    """Forget the loaded schema so next request reloads it."""
+    _cache.clear()
@@ -1,10 +1,19 @@
 """
 Tests for the Django admin modifications.
 """
+from datetime import datetime
+from decimal import Decimal
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.admin import IndexedDatesQuerySet
+from core.models import CatalogTag, Recipe, Tag
 
 
 class AdminSiteTests(TestCase):
@@ -45,3 +54,125 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class RecipeAdminTests(TestCase):
+    """Tests for the recipe, tag and ingredient admin pages."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+        )
+        self.client.force_login(self.admin_user)
+
+    def create_recipes(self, count, **params):
+        """Create recipes each owned by a new user."""
+        for i in range(Recipe.all_objects.count(), count):
+            user = get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='testpass123')
+            Recipe.objects.create(
+                user=user,
+                title=params.get('title', f'Recipe {i}'),
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+
+    def test_changelist_queries_bounded(self):
+        """Test the recipe list doesn't query per row."""
+        url = reverse('admin:core_recipe_changelist')
+        self.create_recipes(1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        self.create_recipes(20)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+
+    def test_search_prefix(self):
+        """Test search matches title prefixes and exact emails."""
+        self.create_recipes(2)
+        Recipe.objects.filter(user__email='user1@example.com').update(
+            title='Pancakes')
+        url = reverse('admin:core_recipe_changelist')
+
+        response = self.client.get(url, {'q': 'Pan'})
+        self.assertContains(response, 'Pancakes')
+        self.assertNotContains(response, 'Recipe 0')
+
+        response = self.client.get(url, {'q': 'user0@example.com'})
+        self.assertContains(response, 'Recipe 0')
+        self.assertNotContains(response, 'Pancakes')
+
+    def test_soft_deleted_listed(self):
+        """Test soft deleted recipes still show in the admin."""
+        self.create_recipes(1)
+        Recipe.objects.update(deleted_on=timezone.now())
+
+        response = self.client.get(reverse('admin:core_recipe_changelist'))
+
+        self.assertContains(response, 'Recipe 0')
+
+    def test_tag_autocomplete(self):
+        """Test tags are searchable for the recipe autocomplete."""
+        Tag.objects.create(user=self.admin_user, name='Vegan')
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'core',
+            'model_name': 'recipe',
+            'field_name': 'tags',
+            'term': 'Veg',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['text'], 'Vegan')
+
+    def test_indexed_dates_match_datetimes(self):
+        """Test probing periods finds the same dates as DISTINCT."""
+        self.create_recipes(3)
+        for recipe, day in zip(Recipe.objects.order_by('id'), (1, 1, 20)):
+            Recipe.objects.filter(id=recipe.id).update(create_on=(
+                timezone.make_aware(datetime(2023, 3 if day == 20 else 1,
+                                             day, 12))))
+        queryset = Recipe.all_objects.all()
+        indexed = IndexedDatesQuerySet(
+            model=Recipe, query=queryset.query, using=queryset.db)
+
+        for kind in ('year', 'month', 'day'):
+            self.assertEqual(
+                list(indexed.datetimes('create_on', kind)),
+                list(queryset.datetimes('create_on', kind)),
+            )
+
+
+class CatalogAdminTests(TestCase):
+    """Tests for the catalog admin pages."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass123',
+        )
+        self.client.force_login(self.admin_user)
+        self.tag = Tag.objects.create(user=self.admin_user, name='Vegan')
+
+    def test_catalog_listed(self):
+        """Test catalog entries are listed."""
+        response = self.client.get(
+            reverse('admin:core_catalogtag_changelist'))
+
+        self.assertContains(response, 'vegan')
+
+    def test_catalog_entries_not_deleted(self):
+        """Test catalog entries can't be deleted."""
+        url = reverse('admin:core_catalogtag_delete',
+                      args=[self.tag.catalog_id])
+
+        response = self.client.post(url, {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(
+            CatalogTag.objects.filter(id=self.tag.catalog_id).exists())
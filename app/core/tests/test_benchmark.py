@@ -0,0 +1,77 @@
+"""
+Tests for the benchmark helpers and commands.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core import benchmark
+from core.models import Recipe, Tag, Ingredient
+
+
+class BenchmarkStatsTests(SimpleTestCase):
+    """Test latency statistics."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentile."""
+        values = list(range(1, 101))
+
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 95), 95)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_summarize(self):
+        """Test summary reports throughput and latency in ms."""
+        stats = benchmark.summarize([0.01, 0.02, 0.03, 0.04], 1, 2)
+
+        self.assertEqual(stats['requests'], 4)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['throughput'], 2)
+        self.assertEqual(stats['p50_ms'], 20)
+        self.assertEqual(stats['p99_ms'], 40)
+
+    def test_compare(self):
+        """Test relative change against a baseline run."""
+        current = {'flows': {'list': {
+            'throughput': 110, 'p50_ms': 5, 'p95_ms': 8, 'p99_ms': 20}}}
+        baseline = {'flows': {'list': {
+            'throughput': 100, 'p50_ms': 5, 'p95_ms': 10, 'p99_ms': 10}}}
+
+        change = benchmark.compare(current, baseline)['list']
+
+        self.assertEqual(change['throughput'], 10)
+        self.assertEqual(change['p50_ms'], 0)
+        self.assertEqual(change['p95_ms'], -20)
+        self.assertEqual(change['p99_ms'], 100)
+
+
+class SeedBenchmarkTests(TestCase):
+    """Test seeding benchmark data."""
+
+    def test_seed_volumes(self):
+        """Test seeding creates the requested volumes."""
+        call_command(
+            'seed_benchmark',
+            users=2, recipes=5, tags=4, ingredients=6, per_recipe=2,
+            stdout=StringIO(),
+        )
+
+        users = get_user_model().objects.filter(
+            email__startswith=benchmark.EMAIL_PREFIX)
+        self.assertEqual(users.count(), 2)
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertEqual(Tag.objects.count(), 8)
+        self.assertEqual(Ingredient.objects.count(), 12)
+        self.assertEqual(Recipe.tags.through.objects.count(), 20)
+        self.assertTrue(users.first().check_password(benchmark.PASSWORD))
+
+    def test_seed_replaces_previous_run(self):
+        """Test seeding twice doesn't duplicate data."""
+        for _ in range(2):
+            call_command('seed_benchmark', users=1, recipes=3,
+                         stdout=StringIO())
+
+        self.assertEqual(Recipe.objects.count(), 3)
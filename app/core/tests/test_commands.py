@@ -2,11 +2,13 @@
 Test costume Django management commands.
 """
 
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 
@@ -33,3 +35,75 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+@patch('core.management.commands.wait_for_db.connections')
+class FastWaitForDbTests(SimpleTestCase):
+    """Test wait_for_db --fast mode."""
+
+    def test_wait_for_db_fast_ready(self, patched_connections):
+        """Test fast mode opens a connection once when database ready."""
+        call_command('wait_for_db', fast=True, stdout=StringIO())
+
+        patched_connections.__getitem__.assert_called_once_with('default')
+        connection = patched_connections['default']
+        connection.ensure_connection.assert_called_once()
+        connection.close.assert_called_once()
+
+    @patch('time.sleep')
+    def test_wait_for_db_fast_backoff(self, patched_sleep,
+                                      patched_connections):
+        """Test fast mode retries with growing backoff delay."""
+        connection = patched_connections['default']
+        connection.ensure_connection.side_effect = [
+            OperationalError] * 4 + [None]
+
+        call_command('wait_for_db', fast=True, stdout=StringIO())
+
+        self.assertEqual(connection.ensure_connection.call_count, 5)
+        delays = [call.args[0] for call in patched_sleep.call_args_list]
+        for delay, limit in zip(delays, [0.05, 0.1, 0.2, 0.4]):
+            self.assertLessEqual(delay, limit)
+
+    def test_wait_for_db_fast_multiple_databases(self, patched_connections):
+        """Test fast mode waits for every database alias."""
+        call_command(
+            'wait_for_db',
+            fast=True,
+            databases=['default', 'replica'],
+            stdout=StringIO(),
+        )
+
+        aliases = {
+            call.args[0]
+            for call in patched_connections.__getitem__.call_args_list
+        }
+        self.assertEqual(aliases, {'default', 'replica'})
+
+    def test_wait_for_db_fast_connect_timeout(self, patched_connections):
+        """Test connection attempts can't outlast the remaining time."""
+        connection = patched_connections['default']
+        connection.vendor = 'postgresql'
+        connection.settings_dict = {'OPTIONS': {'sslmode': 'require'}}
+        used = []
+        connection.ensure_connection.side_effect = lambda: used.append(
+            connection.settings_dict['OPTIONS'])
+
+        call_command(
+            'wait_for_db', fast=True, timeout=30, stdout=StringIO())
+
+        self.assertEqual(
+            used, [{'sslmode': 'require', 'connect_timeout': 30}])
+        self.assertEqual(
+            connection.settings_dict['OPTIONS'], {'sslmode': 'require'})
+
+    @patch('time.sleep')
+    def test_wait_for_db_fast_timeout(self, patched_sleep,
+                                      patched_connections):
+        """Test fast mode gives up after timeout."""
+        connection = patched_connections['default']
+        connection.ensure_connection.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command(
+                'wait_for_db', fast=True, timeout=0, stdout=StringIO())
@@ -0,0 +1,65 @@
+"""
+Tests for response compression.
+"""
+import gzip
+import json
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware import CompressionMiddleware
+
+
+def get_response(content, content_type='application/json'):
+    """Return a view callable responding with given content."""
+    return lambda request: HttpResponse(content, content_type=content_type)
+
+
+@override_settings(COMPRESSION_MIN_LENGTH=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses."""
+
+    def setUp(self):
+        self.request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip')
+        self.content = json.dumps([{'title': 'recipe'}] * 50).encode()
+
+    def test_compress_large_json(self):
+        """Test JSON above threshold is gzipped."""
+        middleware = CompressionMiddleware(get_response(self.content))
+        res = middleware(self.request)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.content), self.content)
+        self.assertIn('Accept-Encoding', res['Vary'])
+
+    def test_skip_small_response(self):
+        """Test response below threshold is not compressed."""
+        middleware = CompressionMiddleware(get_response(b'{"id": 1}'))
+        res = middleware(self.request)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_skip_image_response(self):
+        """Test image responses are not compressed."""
+        middleware = CompressionMiddleware(
+            get_response(self.content, content_type='image/jpeg'))
+        res = middleware(self.request)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_skip_streaming_response(self):
+        """Test streaming responses are passed through."""
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter([self.content])))
+        res = middleware(self.request)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_skip_without_accept_encoding(self):
+        """Test response is not compressed when client can't decode it."""
+        middleware = CompressionMiddleware(get_response(self.content))
+        res = middleware(RequestFactory().get('/'))
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res.content, self.content)
@@ -0,0 +1,59 @@
+"""
+Tests for tunable password hashers.
+"""
+from importlib.util import find_spec
+from unittest import skipUnless
+
+from django.contrib.auth import authenticate, get_user_model
+from django.test import TestCase, override_settings
+
+PBKDF2 = 'core.hashers.PBKDF2PasswordHasher'
+ARGON2 = 'core.hashers.Argon2PasswordHasher'
+
+
+def create_user(email='hasher@example.com', password='testpass123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class HasherTests(TestCase):
+    """Test hashers configured from settings."""
+
+    @override_settings(PASSWORD_HASHERS=[PBKDF2],
+                       PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_iterations_from_settings(self):
+        """Test PBKDF2 uses iterations from settings."""
+        user = create_user()
+
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('testpass123'))
+
+    def test_rehash_on_login_when_cost_changes(self):
+        """Test password is rehashed on login after raising the cost."""
+        with self.settings(PASSWORD_HASHERS=[PBKDF2],
+                           PASSWORD_PBKDF2_ITERATIONS=1000):
+            user = create_user()
+
+        with self.settings(PASSWORD_HASHERS=[PBKDF2],
+                           PASSWORD_PBKDF2_ITERATIONS=2000):
+            authenticate(username=user.email, password='testpass123')
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+    @skipUnless(find_spec('argon2'), 'argon2-cffi not installed')
+    def test_rehash_to_preferred_hasher_on_login(self):
+        """Test old PBKDF2 hash is upgraded to argon2 on login."""
+        with self.settings(PASSWORD_HASHERS=[PBKDF2],
+                           PASSWORD_PBKDF2_ITERATIONS=1000):
+            user = create_user()
+
+        with self.settings(PASSWORD_HASHERS=[ARGON2, PBKDF2],
+                           PASSWORD_ARGON2_MEMORY_COST=1024,
+                           PASSWORD_ARGON2_PARALLELISM=1):
+            authenticated = authenticate(
+                username=user.email, password='testpass123')
+
+        self.assertEqual(authenticated, user)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('argon2$'))
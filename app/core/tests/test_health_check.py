@@ -1,12 +1,22 @@
 """
 Tests for the health check API.
 """
-from django.test import TestCase
+import tempfile
+import threading
+
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core import health
+
+READINESS_URL = reverse('readiness-check')
+
 
 class HealthCheckTests(TestCase):
     """Test the health check API."""
@@ -18,3 +28,83 @@ class HealthCheckTests(TestCase):
         res = client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class ReadinessCheckTests(TestCase):
+    """Test the readiness check API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123', is_staff=True)
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.media_dir.name)
+        self.settings.enable()
+        health.clear_report()
+
+    def tearDown(self):
+        health.clear_report()
+        self.settings.disable()
+        self.media_dir.cleanup()
+
+    def test_readiness_check_public(self):
+        """Test anonymous probes only get pass/fail."""
+        res = self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'healthy': True})
+
+    def test_readiness_check(self):
+        """Test staff see every dependency with latency."""
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['healthy'])
+        for name in ['database', 'media', 'cache']:
+            self.assertTrue(res.data['checks'][name]['healthy'])
+            self.assertIn('latency_ms', res.data['checks'][name])
+
+    def test_readiness_check_failing_dependency(self):
+        """Test readiness returns 503 when a dependency is down."""
+        failing = MagicMock(side_effect=RuntimeError('connection refused'))
+
+        with patch.dict(health.CHECKS, {'database': failing}):
+            public = self.client.get(READINESS_URL)
+            self.client.force_authenticate(self.staff)
+            res = self.client.get(READINESS_URL)
+
+        self.assertEqual(public.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(public.data, {'healthy': False})
+        self.assertEqual(res.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(res.data['checks']['database']['healthy'])
+        self.assertEqual(res.data['checks']['database']['error'],
+                         'connection refused')
+
+    def test_readiness_check_cached(self):
+        """Test repeated probes within the TTL reuse the last report."""
+        check = MagicMock()
+
+        with patch.dict(health.CHECKS, {'database': check}):
+            self.client.get(READINESS_URL)
+            self.client.get(READINESS_URL)
+
+        check.assert_called_once()
+
+    def test_expired_report_served_while_refreshing(self):
+        """Test probes don't wait for another thread running the checks."""
+        check = MagicMock()
+        health.get_report()
+        health._result['expires'] = 0
+        health._result['running'] = threading.Event()
+
+        try:
+            with patch.dict(health.CHECKS, {'database': check}):
+                report = health.get_report()
+        finally:
+            health._result['running'] = None
+
+        self.assertTrue(report['healthy'])
+        check.assert_not_called()
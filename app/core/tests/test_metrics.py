@@ -0,0 +1,79 @@
+"""
+Tests for the metrics API.
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+METRICS_URL = reverse('metrics')
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+    """Test the metrics API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-token')
+
+    def test_metrics_need_token(self):
+        """Test scrapes without the token are rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_disabled_without_token(self):
+        """Test the endpoint doesn't exist unless a token is set."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_metrics_format(self):
+        """Test metrics are returned in Prometheus text format."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+
+    def test_request_metrics_recorded(self):
+        """Test requests are counted per route with latency and queries."""
+        self.client.get(reverse('health-check'))
+
+        res = self.client.get(METRICS_URL)
+        content = res.content.decode()
+
+        self.assertIn(
+            'http_requests_total{method="GET",route="health-check",'
+            'status="200"}',
+            content,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",'
+            'route="health-check"}',
+            content,
+        )
+        self.assertIn('db_queries_per_request_count{route="health-check"}',
+                      content)
+
+    def test_unmatched_route_label(self):
+        """Test unknown URLs share a single route label."""
+        self.client.get('/api/does-not-exist/')
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertIn('route="<unmatched>"', res.content.decode())
+
+    def test_connection_metrics(self):
+        """Test open connections are counted, not flagged."""
+        self.client.get(reverse('health-check'))
+
+        content = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn('db_connections_open{alias="default"} 1.0', content)
+        self.assertIn('db_connections_opened_total{alias="default"}',
+                      content)
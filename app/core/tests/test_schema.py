@@ -0,0 +1,95 @@
+"""
+Tests for the pre-generated API schema.
+"""
+import gzip
+import os
+import tempfile
+
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import schema
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class SchemaTests(SimpleTestCase):
+    """Test building and serving the schema."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.schema_file = os.path.join(self.tmp_dir.name, 'openapi.yaml')
+        self.client = APIClient()
+        schema.clear_cache()
+
+    def tearDown(self):
+        schema.clear_cache()
+        self.tmp_dir.cleanup()
+
+    def test_build_schema_writes_compressed_files(self):
+        """Test command writes schema and gzip variant."""
+        call_command('build_schema', file=self.schema_file)
+
+        with open(self.schema_file, 'rb') as f:
+            content = f.read()
+        with open(self.schema_file + '.gz', 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), content)
+        self.assertIn(b'openapi', content)
+
+    def test_serve_precompressed_schema(self):
+        """Test schema endpoint serves stored gzip file."""
+        call_command('build_schema', file=self.schema_file)
+
+        with override_settings(SCHEMA_FILE=self.schema_file):
+            res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        with open(self.schema_file + '.gz', 'rb') as f:
+            self.assertEqual(res.content, f.read())
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+
+    @patch('core.schema.generate_schema')
+    def test_schema_generated_once(self, patched_generate):
+        """Test schema is generated once and then served from memory."""
+        patched_generate.return_value = b'openapi: 3.0.3\n'
+
+        with override_settings(SCHEMA_FILE=self.schema_file):
+            self.client.get(SCHEMA_URL)
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.content, b'openapi: 3.0.3\n')
+        patched_generate.assert_called_once()
+
+    @patch('core.schema.generate_schema')
+    def test_schema_not_modified(self, patched_generate):
+        """Test matching If-None-Match returns 304 without body."""
+        patched_generate.return_value = b'openapi: 3.0.3\n'
+
+        with override_settings(SCHEMA_FILE=self.schema_file):
+            etag = self.client.get(SCHEMA_URL)['ETag']
+            res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    @patch('core.schema.generate_schema')
+    def test_schema_cached_per_format_and_language(self, patched_generate):
+        """Test JSON and translated schemas are generated once each."""
+        patched_generate.side_effect = lambda renderer, lang: (
+            f'{renderer.format} {lang}'.encode())
+
+        with override_settings(SCHEMA_FILE=self.schema_file):
+            for _ in range(2):
+                json = self.client.get(SCHEMA_URL, {'format': 'json'})
+                german = self.client.get(SCHEMA_URL, {'lang': 'de'})
+                unknown = self.client.get(SCHEMA_URL, {'lang': 'xx'})
+
+        self.assertEqual(json.content, b'json None')
+        self.assertEqual(german.content, b'yaml de')
+        self.assertEqual(unknown.content, b'yaml None')
+        self.assertEqual(patched_generate.call_count, 3)
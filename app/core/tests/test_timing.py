@@ -0,0 +1,55 @@
+"""
+Tests for request timing instrumentation.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+RECIPE_URL = reverse('recipe:recipe-list')
+
+
+class RequestTimingTests(TestCase):
+    """Test RequestTimingMiddleware."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='timing@example.com',
+            password='testpass123',
+        )
+        Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price=Decimal('5.50'),
+        )
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_server_timing_header(self):
+        """Test enabled middleware reports query and timing breakdown."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with self.assertLogs('core.middleware', level='INFO') as logs:
+            res = client.get(RECIPE_URL)
+
+        metrics = res['Server-Timing']
+        for name in ['db;', 'serializer;', 'render;', 'total;']:
+            self.assertIn(name, metrics)
+        self.assertIn('queries', metrics)
+        self.assertIn(RECIPE_URL, logs.output[0])
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled_by_default(self):
+        """Test no timing header when instrumentation is disabled."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        res = client.get(RECIPE_URL)
+
+        self.assertFalse(res.has_header('Server-Timing'))
@@ -0,0 +1,35 @@
+"""
+Helpers shared by the test suites of the apps.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+
+
+class QueryCountMixin:
+    """Assert the query count of a request doesn't grow with data.
+
+    Test cases define add_data(), adding rows the request reads.
+    """
+
+    def add_data(self):
+        raise NotImplementedError('QueryCountMixin needs add_data().')
+
+    def assertQueriesBounded(self, max_queries, request,
+                             status_code=status.HTTP_200_OK):
+        """Assert request stays within max_queries before and after
+        add_data(), answering status_code both times."""
+        with CaptureQueriesContext(connection) as small:
+            small_response = request()
+        self.add_data()
+        with CaptureQueriesContext(connection) as large:
+            large_response = request()
+
+        self.assertEqual(small_response.status_code, status_code)
+        self.assertEqual(large_response.status_code, status_code)
+        self.assertLessEqual(len(small), max_queries, small.captured_queries)
+        self.assertEqual(
+            len(small), len(large),
+            'Query count grows with data',
+        )
@@ -0,0 +1,83 @@
+"""
+Per-request timing records used by RequestTimingMiddleware.
+"""
+import contextvars
+import time
+
+from contextlib import contextmanager
+
+
+# timings of the current request, None when instrumentation is disabled
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Accumulated durations (in seconds) for one request."""
+
+    def __init__(self):
+        self.durations = {}
+        self.query_count = 0
+        # names currently being measured, to skip nested measurements
+        self.active = set()
+
+    def add(self, name, duration):
+        """Add duration to the named bucket."""
+        self.durations[name] = self.durations.get(name, 0) + duration
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper counting queries and their time."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.add('db', time.perf_counter() - start)
+
+
+def start():
+    """Start recording timings for the current request."""
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def current():
+    """Return timings of the current request or None."""
+    return _current.get()
+
+
+def stop(token):
+    """Stop recording timings for the current request."""
+    _current.reset(token)
+
+
+@contextmanager
+def measure(name):
+    """Add the duration of the block to the named bucket.
+
+    Does nothing when no request is being recorded. Nested blocks with
+    the same name are only counted once (by the outermost one).
+    """
+    timing = _current.get()
+    if timing is None or name in timing.active:
+        yield
+        return
+
+    timing.active.add(name)
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start_time)
+        timing.active.discard(name)
+
+
+class TimedSerializerMixin:
+    """Record serializer time of the current request."""
+
+    def to_representation(self, instance):
+        with measure('serializer'):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args, **kwargs):
+        with measure('serializer'):
+            return super().run_validation(*args, **kwargs)
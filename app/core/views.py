@@ -1,11 +1,92 @@
 """
 Core views for app.
 """
+import hmac
+
+from drf_spectacular.utils import extend_schema
+from prometheus_client import CONTENT_TYPE_LATEST
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotModified,
+)
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from core import compression, health, metrics
+from core.schema import language_key, load_schema
+
 
 @api_view(['GET'])
 def health_check(request):
     """Returns successful response."""
     return Response({'healthy': True})
+
+
+@api_view(['GET'])
+def readiness_check(request):
+    """Returns dependency status, 503 if any of them is down.
+
+    Only staff see the checks with their errors and latency.
+    """
+    report = health.get_report()
+    if not request.user.is_staff:
+        report = {'healthy': report['healthy']}
+    if report['healthy']:
+        return Response(report)
+    return Response(report, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@require_GET
+def metrics_view(request):
+    """Returns metrics in Prometheus text format.
+
+    Disabled unless METRICS_TOKEN is set, scrapers send it as a bearer
+    token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    if not hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', '').encode(),
+            expected.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_latest(),
+        content_type=CONTENT_TYPE_LATEST,
+    )
+
+
+class SchemaView(SpectacularAPIView):
+    """Serve the schema from memory instead of rebuilding per request."""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        variants = load_schema(
+            request.accepted_renderer,
+            language_key(request.GET.get('lang')),
+        )
+        encoding = next(iter(compression.accepted_encodings(request)), None)
+        content, etag = variants[encoding]
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                content,
+                content_type=request.accepted_renderer.media_type,
+            )
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -0,0 +1,135 @@
+"""
+Shared catalog of tag and ingredient names.
+
+Tags and ingredients stay per user, their ids and spelling are the
+user's, but each row points at one canonical CatalogTag or
+CatalogIngredient of its normalized name. "Salt", "salt " and "SALT" of
+a million users are one catalog row, so cross-user features group or
+search the small catalog instead of the per-user tables.
+
+Recipes reuse the user's row of a name whatever its spelling
+(get_or_create_alias), so a user has one row per catalog entry.
+
+Names are resolved through an in-process LRU cache. Ids are only cached
+once the transaction that read or created them has committed, so a
+rollback never leaves an id of a missing row behind.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import CatalogIngredient, CatalogTag, Ingredient, Tag
+
+CATALOGS = {
+    Tag: CatalogTag,
+    Ingredient: CatalogIngredient,
+}
+
+
+def normalize(name):
+    """Return the catalog form of a name."""
+    return ' '.join(name.split()).lower()[:255]
+
+
+class NameCache:
+    """Thread safe LRU mapping of (catalog, name) to catalog id."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._ids.get(key)
+            if value is not None:
+                self._ids.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._ids[key] = value
+            self._ids.move_to_end(key)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+name_cache = NameCache(settings.CATALOG_CACHE_SIZE)
+
+
+def resolve_many(model, names):
+    """Return {normalized name: catalog id} for tag/ingredient names.
+
+    Missing catalog entries are created. Cached names cost no query,
+    the others two: one insert ignoring existing names and one select.
+    """
+    catalog = CATALOGS[model]
+    ids = {}
+    missing = set()
+    for name in map(normalize, names):
+        ids[name] = name_cache.get((catalog, name))
+        if ids[name] is None:
+            missing.add(name)
+    if not missing:
+        return ids
+
+    # concurrent inserts of a name are fine, the unique index keeps one
+    catalog.objects.bulk_create(
+        [catalog(name=name) for name in missing], ignore_conflicts=True)
+    found = dict(catalog.objects.filter(
+        name__in=missing).values_list('name', 'id'))
+    ids.update(found)
+
+    def remember():
+        for name, catalog_id in found.items():
+            name_cache.set((catalog, name), catalog_id)
+    transaction.on_commit(remember)
+    return ids
+
+
+def resolve(model, name):
+    """Return the catalog id of a tag/ingredient name."""
+    return resolve_many(model, [name])[normalize(name)]
+
+
+def link_catalog(queryset, batch_size=1000):
+    """Point rows of queryset without a catalog entry at theirs.
+
+    For rows written without signals (bulk_create, raw SQL). Yields the
+    number of rows linked by every batch.
+    """
+    unlinked = queryset.filter(catalog__isnull=True)
+    while True:
+        with transaction.atomic():
+            rows = list(unlinked.values_list('id', 'name')[:batch_size])
+            if not rows:
+                return
+            ids = resolve_many(queryset.model, [name for _, name in rows])
+            by_catalog = {}
+            for row_id, name in rows:
+                by_catalog.setdefault(ids[normalize(name)], []).append(row_id)
+            for catalog_id, row_ids in by_catalog.items():
+                queryset.model.all_objects.filter(id__in=row_ids).update(
+                    catalog_id=catalog_id)
+        yield len(rows)
+
+
+def get_or_create_alias(model, user, name):
+    """Return the user's tag/ingredient of a name and whether it's new.
+
+    Any spelling of the name ("Salt", "salt ") finds the user's existing
+    row, a new row keeps the spelling given.
+    """
+    catalog_id = resolve(model, name)
+    obj = model.objects.filter(
+        user=user, catalog_id=catalog_id).order_by('id').first()
+    if obj is not None:
+        return obj, False
+    return model.objects.create(
+        user=user, name=name, catalog_id=catalog_id), True
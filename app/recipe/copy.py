@@ -0,0 +1,115 @@
+"""
+Copy recipes with INSERT ... SELECT.
+
+The recipe row, its tag and ingredient links and, when copying to
+another user, missing tags/ingredients of that user are created by a
+fixed number of statements inside the database, whatever the number of
+copies or links. The image column is copied as is, copies share the
+stored file (files are never deleted when recipes are).
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.stats import invalidate_stats
+
+# attribute model -> (through model, column of the attribute)
+LINKS = {
+    Tag: (Recipe.tags.through, 'tag_id'),
+    Ingredient: (Recipe.ingredients.through, 'ingredient_id'),
+}
+
+# a row of the target user (own) for the same name as src, whatever its
+# spelling; rows not linked to the catalog yet fall back to the exact name
+SAME_ENTRY = (
+    '(own.catalog_id = src.catalog_id '
+    'OR (src.catalog_id IS NULL AND own.name = src.name))'
+)
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def _insert_recipes(cursor, recipe, user_id, count, now):
+    """Insert count copies of recipe, return their ids."""
+    table = _q(Recipe._meta.db_table)
+    copies = ' UNION ALL '.join(['SELECT 1'] * count)
+    cursor.execute(
+        f'INSERT INTO {table} '
+        f'(user_id, title, description, time_minutes, price, link, '
+        f'image, is_public, create_on, update_on) '
+        f'SELECT %s, title, description, time_minutes, price, link, '
+        f'image, %s, %s, %s FROM {table} CROSS JOIN ({copies}) AS copies '
+        f'WHERE id = %s '
+        f'RETURNING id',
+        # copies start private
+        [user_id, False, now, now, recipe.id],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _insert_missing(cursor, model, recipe, user_id, now):
+    """Create attributes of recipe the target user has no match for."""
+    through, column = LINKS[model]
+    table = _q(model._meta.db_table)
+    links = _q(through._meta.db_table)
+    cursor.execute(
+        f'INSERT INTO {table} '
+        f'(name, catalog_id, user_id, recipe_count, update_on) '
+        f'SELECT DISTINCT src.name, src.catalog_id, %s, 0, %s '
+        f'FROM {table} src '
+        f'JOIN {links} link ON link.{column} = src.id '
+        f'WHERE link.recipe_id = %s AND src.deleted_on IS NULL '
+        f'AND NOT EXISTS (SELECT 1 FROM {table} own '
+        f'WHERE own.user_id = %s AND {SAME_ENTRY} '
+        f'AND own.deleted_on IS NULL)',
+        [user_id, now, recipe.id, user_id],
+    )
+
+
+def _insert_links(cursor, model, recipe, user_id, new_ids):
+    """Link every copy to the attributes of recipe.
+
+    Attributes are matched by catalog entry among the target user's live
+    rows, for a copy to the owner that is the same row.
+    """
+    through, column = LINKS[model]
+    table = _q(model._meta.db_table)
+    links = _q(through._meta.db_table)
+    recipes = _q(Recipe._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(new_ids))
+    # lowest id wins if the user has duplicates
+    cursor.execute(
+        f'INSERT INTO {links} (recipe_id, {column}) '
+        f'SELECT DISTINCT copy.id, (SELECT MIN(own.id) FROM {table} own '
+        f'WHERE own.user_id = %s AND {SAME_ENTRY} '
+        f'AND own.deleted_on IS NULL) '
+        f'FROM {recipes} copy CROSS JOIN {links} link '
+        f'JOIN {table} src ON src.id = link.{column} '
+        f'WHERE link.recipe_id = %s AND src.deleted_on IS NULL '
+        f'AND copy.id IN ({placeholders})',
+        [user_id, recipe.id, *new_ids],
+    )
+
+
+@transaction.atomic
+def copy_recipe(recipe, user, count=1):
+    """Copy recipe count times into the account of user.
+
+    Returns the ids of the copies.
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        new_ids = _insert_recipes(cursor, recipe, user.id, count, now)
+        for model in (Tag, Ingredient):
+            if user.id != recipe.user_id:
+                _insert_missing(cursor, model, recipe, user.id, now)
+            _insert_links(cursor, model, recipe, user.id, new_ids)
+
+    # raw inserts send no signals, recount what the copies link to
+    for model, (through, column) in LINKS.items():
+        linked = through.objects.filter(recipe_id=new_ids[0]).values(column)
+        model.all_objects.filter(id__in=linked).refresh_recipe_counts()
+    invalidate_stats(user.id)
+    return new_ids
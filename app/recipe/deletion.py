@@ -0,0 +1,90 @@
+"""
+Soft delete of recipes, tags and ingredients and their batched purge.
+
+Deleting through the API only marks the row (deleted_on), records a
+tombstone for delta sync and releases recipe counts, a few single row
+writes. purge_deleted later removes marked rows and their M2M links in
+small batches, each in its own short transaction, so large cascades
+never hold locks for long.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient, Tombstone
+
+TOMBSTONE_KINDS = {
+    Recipe: Tombstone.RECIPE,
+    Tag: Tombstone.TAG,
+    Ingredient: Tombstone.INGREDIENT,
+}
+
+# model -> M2M through tables and the column pointing at the model
+LINKS = {
+    Recipe: [
+        (Recipe.tags.through, 'recipe_id'),
+        (Recipe.ingredients.through, 'recipe_id'),
+    ],
+    Tag: [(Recipe.tags.through, 'tag_id')],
+    Ingredient: [(Recipe.ingredients.through, 'ingredient_id')],
+}
+
+
+@transaction.atomic
+def soft_delete(obj):
+    """Hide obj from the API, the row is purged later."""
+    model = type(obj)
+    obj.deleted_on = timezone.now()
+    obj.save(update_fields=['deleted_on', 'update_on'])
+    Tombstone.objects.create(
+        user_id=obj.user_id,
+        kind=TOMBSTONE_KINDS[model],
+        object_id=obj.pk,
+    )
+    if model is Recipe:
+        # counts only include live recipes
+        for counted in (Tag, Ingredient):
+            counted.all_objects.filter(recipe=obj).update(
+                recipe_count=F('recipe_count') - 1)
+
+
+def _delete_links(through, column, ids, batch_size):
+    """Delete M2M rows pointing at ids, batch_size rows per statement."""
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            link_ids = list(through.objects.filter(
+                **{f'{column}__in': ids},
+            ).values_list('id', flat=True)[:batch_size])
+            if not link_ids:
+                return deleted
+            through.objects.filter(id__in=link_ids).delete()
+        deleted += len(link_ids)
+
+
+def purge_model(model, before, batch_size):
+    """Hard delete rows of model soft deleted before the given time.
+
+    Yields the number of rows removed by every batch.
+    """
+    marked = model.all_objects.filter(deleted_on__lt=before)
+    while True:
+        ids = list(marked.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        for through, column in LINKS[model]:
+            _delete_links(through, column, ids, batch_size)
+        with transaction.atomic():
+            model.all_objects.filter(id__in=ids).delete()
+        yield len(ids)
+
+
+def purge_tombstones(before, batch_size):
+    """Delete tombstones older than the given time, yields batch sizes."""
+    expired = Tombstone.objects.filter(deleted_on__lt=before)
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        Tombstone.objects.filter(id__in=ids).delete()
+        yield len(ids)
@@ -0,0 +1,41 @@
+"""
+"What can I cook": recipes covered by a set of ingredients.
+
+Set containment is computed in one aggregate query: for every candidate
+recipe the database counts its live ingredients and how many of them
+are in the pantry, the difference is what is missing. Candidates are
+found through the index of the ingredient column of the link table, so
+only recipes using at least one pantry ingredient are aggregated,
+whatever the number of recipes the user owns.
+"""
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+
+from core.models import Recipe
+
+
+def cookable_recipes(user, ingredient_ids, max_missing=0):
+    """Return recipes of user missing at most max_missing ingredients.
+
+    Recipes are annotated with total, have and missing counts and
+    ordered by coverage (have / total), best first.
+    """
+    through = Recipe.ingredients.through
+    candidates = through.objects.filter(
+        ingredient_id__in=ingredient_ids).values('recipe_id')
+    live = Q(ingredients__deleted_on__isnull=True)
+    return Recipe.objects.filter(
+        user=user, id__in=candidates,
+    ).annotate(
+        total=Count('ingredients', filter=live),
+        have=Count(
+            'ingredients',
+            filter=live & Q(ingredients__id__in=ingredient_ids),
+        ),
+    ).annotate(
+        missing=F('total') - F('have'),
+        coverage=Cast('have', FloatField()) / Cast('total', FloatField()),
+    ).filter(
+        have__gt=0,
+        missing__lte=max_missing,
+    ).order_by('-coverage', 'missing', '-id')
@@ -0,0 +1,118 @@
+"""
+Public feed of shared recipes.
+
+Everyone reads the same data, so pages and recipes are cached in the
+shared cache. Entries are kept PUBLIC_RECIPE_STALE_TTL seconds past
+their PUBLIC_RECIPE_CACHE_TTL freshness: once stale, one request takes a
+lock and recomputes while the others keep serving the stale copy. On a
+cold miss the others wait for the lock holder instead of all hitting the
+database at once.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from core.models import Recipe
+
+FEED_GENERATION_KEY = 'public-recipes:gen'
+
+# a lock outliving this is assumed dead, waiters compute themselves
+LOCK_TIMEOUT = 5
+WAIT_INTERVAL = 0.05
+
+
+def recipe_cache_key(recipe_id):
+    """Return cache key of a public recipe."""
+    return f'public-recipe:{recipe_id}'
+
+
+def feed_cache_key(page):
+    """Return cache key of a feed page of the current generation."""
+    generation = cache.get(FEED_GENERATION_KEY, 0)
+    return f'public-recipes:{generation}:{page}'
+
+
+def _invalidate(recipe_id):
+    cache.delete(recipe_cache_key(recipe_id))
+    # new generation, every feed page is recomputed on its next read
+    cache.add(FEED_GENERATION_KEY, 0, timeout=None)
+    try:
+        cache.incr(FEED_GENERATION_KEY)
+    except ValueError:
+        cache.set(FEED_GENERATION_KEY, 1, timeout=None)
+
+
+def invalidate_public(recipe_id):
+    """Drop cached public data of a recipe, now and again on commit."""
+    _invalidate(recipe_id)
+    transaction.on_commit(lambda: _invalidate(recipe_id))
+
+
+def etag(data):
+    """Return a strong ETag of JSON data."""
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+
+
+def _store(key, compute):
+    data = compute()
+    entry = {
+        'data': data,
+        'etag': etag(data),
+        'fresh_until': time.time() + settings.PUBLIC_RECIPE_CACHE_TTL,
+    }
+    cache.set(
+        key, entry,
+        timeout=(settings.PUBLIC_RECIPE_CACHE_TTL
+                 + settings.PUBLIC_RECIPE_STALE_TTL),
+    )
+    return entry
+
+
+def get_or_compute(key, compute):
+    """Return the cache entry of key, recomputing it at most once.
+
+    An entry is a dict of data, etag and fresh_until. Only the request
+    holding the lock calls compute, the others get the stale entry or
+    wait for the new one.
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry
+
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        try:
+            return _store(key, compute)
+        finally:
+            cache.delete(lock)
+    if entry is not None:
+        return entry
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    # lock holder died or is too slow, don't fail the request
+    return _store(key, compute)
+
+
+def public_recipes():
+    """Return the queryset of shared recipes."""
+    return Recipe.objects.filter(is_public=True).prefetch_related(
+        'tags', 'ingredients')
+
+
+def feed_page(page):
+    """Return recipes of a feed page, newest first."""
+    size = settings.PUBLIC_FEED_PAGE_SIZE
+    offset = (page - 1) * size
+    return public_recipes().order_by('-update_on', '-id')[
+        offset:offset + size]
@@ -2,30 +2,59 @@
 Serializers for recipe APIs
 """
 
+from django.conf import settings
+from django.utils.translation import gettext as _
+
 from rest_framework import serializers
 
-from core.models import Recipe, Tag, Ingredient
+from core.models import Recipe, RecipeShare, Tag, Ingredient, Tombstone
+from core.timing import TimedSerializerMixin
+from recipe.catalog import get_or_create_alias, normalize
+
+
+class CatalogNameMixin:
+    """Reject renaming a tag/ingredient onto another row of the user.
 
+    Any spelling of a name is one catalog entry and a user has one row
+    per entry, so "Dinner" can't be renamed "dinner " if that exists.
+    """
 
-class TagSerializer(serializers.ModelSerializer):
+    def validate_name(self, value):
+        # nested in a recipe there is no instance, names are resolved
+        # to the user's row by get_or_create_alias
+        if self.instance is None:
+            return value
+        model = type(self.instance)
+        if model.objects.filter(
+            user_id=self.instance.user_id,
+            catalog__name=normalize(value),
+        ).exclude(pk=self.instance.pk).exists():
+            raise serializers.ValidationError(
+                _('You already have "{name}".').format(name=value))
+        return value
+
+
+class TagSerializer(CatalogNameMixin, TimedSerializerMixin,
+                    serializers.ModelSerializer):
     """Serializer for tags."""
     class Meta:
         model = Tag
-        fields = ['id', 'name']
+        fields = ['id', 'name', 'recipe_count']
         # fields = '__all__'
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'recipe_count']
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(CatalogNameMixin, TimedSerializerMixin,
+                           serializers.ModelSerializer):
     """Serializer for ingredients."""
 
     class Meta:
         model = Ingredient
-        fields = ['id', 'name']
-        read_only_fields = ['id']
+        fields = ['id', 'name', 'recipe_count']
+        read_only_fields = ['id', 'recipe_count']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
@@ -34,7 +63,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         # fields = "__all__"
         fields = ['id', 'title', 'time_minutes',
-                  'price', 'link', 'create_on', 'update_on', 'tags', 'ingredients']
+                  'price', 'link', 'create_on', 'update_on', 'tags', 'ingredients',
+                  'is_public']
         read_only_fields = ['id', 'create_on', 'update_on']
         # exclude = ['id']
 
@@ -42,10 +72,9 @@ class RecipeSerializer(serializers.ModelSerializer):
         """Handle getting or creating tags as needed."""
         auth_user = self.context['request'].user
         for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
+            # any spelling of a name reuses the user's tag
+            tag_obj, created = get_or_create_alias(
+                Tag, auth_user, tag['name'])
             recipe.tags.add(tag_obj)
 
     def _get_or_create_ingredients(self, ingredients, recipe):
@@ -53,10 +82,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         auth_user = self.context['request'].user
         for ingredient in ingredients:
             # created is boolean flag for data is created / not
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
+            ingredient_obj, created = get_or_create_alias(
+                Ingredient, auth_user, ingredient['name'])
             recipe.ingredients.add(ingredient_obj)
 
     def create(self, validated_data):
@@ -112,7 +139,21 @@ class RecipeDetailSerializer(RecipeSerializer):
         fields = RecipeSerializer.Meta.fields + ['description']
 
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+class PublicRecipeSerializer(serializers.ModelSerializer):
+    """Serializer for shared recipes, without owner details."""
+    tags = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field='name')
+    ingredients = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field='name')
+
+    class Meta:
+        model = Recipe
+        fields = ['id', 'title', 'description', 'time_minutes', 'price',
+                  'link', 'image', 'update_on', 'tags', 'ingredients']
+        read_only_fields = fields
+
+
+class RecipeImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for uploading a images in recipe."""
 
     class Meta:
@@ -120,3 +161,160 @@ class RecipeImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image']
         read_only_fields = ['id']
         extra_kwargs = {'image': {'required': 'True'}}
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Query parameters filtering and sorting the recipe list."""
+    # sort keys each backed by a (user, key) index on Recipe
+    ORDERING_CHOICES = [
+        f'{prefix}{key}'
+        for key in ('id', 'time_minutes', 'price', 'create_on', 'update_on')
+        for prefix in ('', '-')
+    ]
+
+    time_min = serializers.IntegerField(required=False, min_value=0)
+    time_max = serializers.IntegerField(required=False, min_value=0)
+    price_min = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False)
+    price_max = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    updated_after = serializers.DateTimeField(required=False)
+    updated_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_CHOICES, required=False, default='-id')
+
+    # query parameter -> ORM lookup
+    LOOKUPS = {
+        'time_min': 'time_minutes__gte',
+        'time_max': 'time_minutes__lte',
+        'price_min': 'price__gte',
+        'price_max': 'price__lte',
+        'created_after': 'create_on__gte',
+        'created_before': 'create_on__lt',
+        'updated_after': 'update_on__gte',
+        'updated_before': 'update_on__lt',
+    }
+
+    def filter_queryset(self, queryset):
+        """Apply validated filters and ordering to queryset."""
+        data = self.validated_data
+        queryset = queryset.filter(**{
+            lookup: data[param]
+            for param, lookup in self.LOOKUPS.items() if param in data
+        })
+        ordering = data['ordering']
+        # id breaks ties so pages of equal values stay stable
+        if ordering.lstrip('-') != 'id':
+            return queryset.order_by(ordering, '-id')
+        return queryset.order_by(ordering)
+
+
+class SyncParamsSerializer(serializers.Serializer):
+    """Query parameters of the sync endpoint."""
+    since = serializers.DateTimeField(
+        required=False,
+        help_text='Watermark returned by the previous sync, omit for all.',
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text='Cursor of the next page returned by the previous page.',
+    )
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=500, default=100)
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """Serializer for deleted objects."""
+    id = serializers.IntegerField(source='object_id')
+
+    class Meta:
+        model = Tombstone
+        fields = ['kind', 'id', 'deleted_on']
+
+
+def validate_max(value, max_value):
+    """Return value, raise a validation error above max_value."""
+    if value > max_value:
+        raise serializers.ValidationError(
+            _('Ensure this value is less than or equal to {max_value}.')
+            .format(max_value=max_value))
+    return value
+
+
+class RecipeCopySerializer(serializers.Serializer):
+    """Serializer for copying a recipe."""
+    count = serializers.IntegerField(
+        required=False, default=1, min_value=1,
+        help_text='Number of copies, at most RECIPE_COPY_MAX.',
+    )
+    to = serializers.EmailField(
+        required=False,
+        help_text='Email of a user to offer the recipe to, they get a '
+                  'copy once they accept the share.',
+    )
+
+    def validate_count(self, value):
+        # read per request, not at import, so settings overrides apply
+        return validate_max(value, settings.RECIPE_COPY_MAX)
+
+    def validate(self, attrs):
+        if 'to' in attrs and attrs['count'] != 1:
+            raise serializers.ValidationError(
+                {'count': ['A share is always a single copy.']})
+        return attrs
+
+
+class RecipeShareSerializer(serializers.ModelSerializer):
+    """Serializer for recipes offered to the user."""
+    title = serializers.CharField(source='recipe.title', read_only=True)
+    sender = serializers.EmailField(
+        source='recipe.user.email', read_only=True)
+
+    class Meta:
+        model = RecipeShare
+        fields = ['id', 'title', 'sender', 'create_on']
+        read_only_fields = fields
+
+
+class PublicFeedSerializer(serializers.Serializer):
+    """Query parameters of the public feed."""
+    page = serializers.IntegerField(
+        required=False, default=1, min_value=1,
+        help_text='Page number, at most PUBLIC_FEED_MAX_PAGES.',
+    )
+
+    def validate_page(self, value):
+        return validate_max(value, settings.PUBLIC_FEED_MAX_PAGES)
+
+
+class SimilarParamsSerializer(serializers.Serializer):
+    """Query parameters of similar recipes."""
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=50)
+
+
+class CookableParamsSerializer(serializers.Serializer):
+    """Query parameters of recipes cookable from a set of ingredients."""
+    ingredients = serializers.CharField(
+        help_text='Comma separated list of ingredient IDs at hand.')
+    missing = serializers.IntegerField(
+        required=False, default=0, min_value=0, max_value=10,
+        help_text='Most ingredients a recipe may lack.',
+    )
+    limit = serializers.IntegerField(
+        required=False, default=50, min_value=1, max_value=200)
+
+    def validate_ingredients(self, value):
+        """Return the ingredient ids as a set of integers."""
+        try:
+            ids = {int(item) for item in value.split(',') if item.strip()}
+        except ValueError:
+            raise serializers.ValidationError(
+                'Expected a comma separated list of IDs.')
+        if not ids:
+            raise serializers.ValidationError('No ingredients given.')
+        if len(ids) > 1000:
+            raise serializers.ValidationError('Too many ingredients.')
+        return ids
@@ -0,0 +1,158 @@
+"""
+Signal handlers keeping Tag/Ingredient.recipe_count up to date and
+dropping cached recipe stats and public recipe data on writes.
+
+Counts change with F() updates inside the transaction of the M2M write,
+so concurrent writers don't lose increments.
+"""
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient, Tombstone
+from recipe.catalog import resolve
+from recipe.public import invalidate_public
+from recipe.stats import invalidate_stats
+
+
+def _add(model, ids, delta):
+    """Add delta to recipe_count of the given ids."""
+    if ids and delta:
+        model.objects.filter(pk__in=ids).update(
+            recipe_count=F('recipe_count') + delta)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_recipe_counts(sender, instance, action, reverse, model, pk_set,
+                         **kwargs):
+    """Apply M2M adds, removes and clears to recipe_count."""
+    # add/remove run in a transaction with the signals, so pre_ actions
+    # still see the links about to be removed
+    if not reverse:
+        # instance is a recipe, pk_set holds tag/ingredient ids
+        if action == 'post_add':
+            _add(model, pk_set, 1)
+        elif action == 'pre_remove':
+            model.objects.filter(pk__in=pk_set, recipe=instance).update(
+                recipe_count=F('recipe_count') - 1)
+        elif action == 'pre_clear':
+            model.objects.filter(recipe=instance).update(
+                recipe_count=F('recipe_count') - 1)
+        return
+
+    # instance is a tag/ingredient, pk_set holds recipe ids
+    counted = type(instance)
+    if action == 'post_add':
+        _add(counted, [instance.pk], len(pk_set))
+    elif action == 'pre_remove':
+        linked = instance.recipe_set.filter(pk__in=pk_set)
+        _add(counted, [instance.pk], -linked.count())
+    elif action == 'pre_clear':
+        counted.objects.filter(pk=instance.pk).update(recipe_count=0)
+
+
+@receiver(pre_save, sender=Tag)
+@receiver(pre_save, sender=Ingredient)
+def link_catalog_entry(sender, instance, update_fields=None, **kwargs):
+    """Point a tag or ingredient at the catalog entry of its name."""
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    if instance._state.adding and instance.catalog_id is not None:
+        # resolved by the caller (get_or_create_alias)
+        return
+    instance.catalog_id = resolve(sender, instance.name)
+
+
+@receiver(pre_delete, sender=Recipe)
+def release_recipe_counts(sender, instance, **kwargs):
+    """Decrement counts of a deleted recipe's tags and ingredients."""
+    # the cascade removes M2M rows without sending m2m_changed
+    if instance.deleted_on is not None:
+        # already released by the soft delete
+        return
+    for model in (Tag, Ingredient):
+        model.objects.filter(recipe=instance).update(
+            recipe_count=F('recipe_count') - 1)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_user_stats(sender, instance, **kwargs):
+    """Drop cached stats of the owner of a changed object."""
+    invalidate_stats(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_user_stats_m2m(sender, instance, action, **kwargs):
+    """Drop cached stats when recipe tags or ingredients change."""
+    if action.startswith('post_'):
+        invalidate_stats(instance.user_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_public_recipe(sender, instance, **kwargs):
+    """Drop public caches when a shared recipe changes or is unshared."""
+    if instance.is_public or getattr(instance, '_was_public', False):
+        invalidate_public(instance.pk)
+    instance._was_public = instance.is_public
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_public_recipe_m2m(sender, instance, action, reverse,
+                                 **kwargs):
+    """Drop public caches when a shared recipe's links change."""
+    # renamed or relinked tags show up once the entries go stale
+    if (action.startswith('post_') and not reverse
+            and instance.is_public):
+        invalidate_public(instance.pk)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def touch_recipes(sender, instance, action, reverse, pk_set, **kwargs):
+    """Move update_on of recipes whose tags or ingredients changed."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    now = timezone.now()
+    if not reverse:
+        instance.update_on = now
+        Recipe.objects.filter(pk=instance.pk).update(update_on=now)
+    elif pk_set:
+        Recipe.objects.filter(pk__in=pk_set).update(update_on=now)
+
+
+TOMBSTONE_KINDS = {
+    Recipe: Tombstone.RECIPE,
+    Tag: Tombstone.TAG,
+    Ingredient: Tombstone.INGREDIENT,
+}
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deletions so delta sync can report them."""
+    if instance.deleted_on is not None:
+        # recorded by the soft delete
+        return
+    Tombstone.objects.create(
+        user_id=instance.user_id,
+        kind=TOMBSTONE_KINDS[sender],
+        object_id=instance.pk,
+    )
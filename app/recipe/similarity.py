@@ -0,0 +1,172 @@
+"""
+"Recipes like this one" from shared tags and ingredients.
+
+Each recipe is reduced to a MinHash signature of its tag and ingredient
+ids, cut into BANDS bands of ROWS values. Every band is hashed into a
+RecipeBand bucket, so recipes with a Jaccard similarity around
+(1 / BANDS) ** (1 / ROWS) or more are likely to share a bucket. A lookup
+reads the buckets of one recipe through the (user, band, bucket) index,
+then scores the few candidates with their exact Jaccard similarity.
+
+The index is brought up to date by the update_similarity command, which
+only visits recipes changed since they were indexed (update_on is moved
+by every edit, including tag and ingredient changes). A stale recipe
+is also reindexed when it is looked up.
+"""
+import hashlib
+import random
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from core.models import Recipe, RecipeBand
+
+BANDS = 16
+ROWS = 4
+# candidates scored exactly per lookup
+CANDIDATES = 100
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# fixed seed, signatures must not change between processes
+_rng = random.Random(4127)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(BANDS * ROWS)
+]
+
+
+def _hash(value):
+    """Return a stable 64 bit hash of a string."""
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def signature(features):
+    """Return the MinHash signature of a set of feature strings."""
+    hashes = [_hash(feature) for feature in features]
+    return [
+        min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def buckets(features):
+    """Return the (band, bucket) pairs of a set of feature strings."""
+    if not features:
+        return []
+    values = signature(features)
+    pairs = []
+    for band in range(BANDS):
+        rows = values[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            ','.join(map(str, rows)).encode(), digest_size=8).digest()
+        # signed to fit a BigIntegerField
+        pairs.append((band, int.from_bytes(digest, 'big', signed=True)))
+    return pairs
+
+
+def jaccard(a, b):
+    """Return the Jaccard similarity of two sets."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def features_of(recipe_ids):
+    """Return {recipe id: set of feature strings} read from the M2M tables."""
+    features = defaultdict(set)
+    for prefix, through, column in (
+        ('t', Recipe.tags.through, 'tag_id'),
+        ('i', Recipe.ingredients.through, 'ingredient_id'),
+    ):
+        rows = through.objects.filter(
+            recipe_id__in=recipe_ids).values_list('recipe_id', column)
+        for recipe_id, attr_id in rows:
+            features[recipe_id].add(f'{prefix}{attr_id}')
+    return features
+
+
+@transaction.atomic
+def index_recipes(recipe_ids):
+    """Recompute the buckets of the given recipes.
+
+    Soft deleted recipes lose their buckets.
+    """
+    recipes = list(Recipe.all_objects.filter(id__in=recipe_ids).values_list(
+        'id', 'user_id', 'deleted_on', 'update_on'))
+    ids = [recipe_id for recipe_id, _, _, _ in recipes]
+    features = features_of(ids)
+
+    RecipeBand.objects.filter(recipe_id__in=ids).delete()
+    RecipeBand.objects.bulk_create([
+        RecipeBand(recipe_id=recipe_id, user_id=user_id,
+                   band=band, bucket=bucket)
+        for recipe_id, user_id, deleted_on, _ in recipes
+        if deleted_on is None
+        for band, bucket in buckets(features[recipe_id])
+    ])
+    # mark only recipes still at the update_on read with their features,
+    # one edited meanwhile stays stale for the next run whatever the
+    # clocks of the processes writing update_on say
+    by_update = defaultdict(list)
+    for recipe_id, _, _, update_on in recipes:
+        by_update[update_on].append(recipe_id)
+    unchanged = Q()
+    for update_on, group in by_update.items():
+        unchanged |= Q(id__in=group, update_on=update_on)
+    if unchanged:
+        Recipe.all_objects.filter(unchanged).update(
+            similarity_indexed_on=F('update_on'))
+    return len(ids)
+
+
+def stale_recipes():
+    """Return recipes changed since they were indexed."""
+    return Recipe.all_objects.filter(
+        Q(similarity_indexed_on__isnull=True)
+        | Q(similarity_indexed_on__lt=F('update_on'))
+    )
+
+
+def is_stale(recipe):
+    """Return whether recipe changed since it was indexed."""
+    indexed = recipe.similarity_indexed_on
+    return indexed is None or indexed < recipe.update_on
+
+
+def similar_recipes(recipe, limit=10):
+    """Return [(recipe id, similarity)] of the recipes most like recipe.
+
+    Only the owner's live recipes are considered, best first.
+    """
+    if is_stale(recipe):
+        index_recipes([recipe.id])
+    own = RecipeBand.objects.filter(
+        recipe_id=recipe.id).values_list('band', 'bucket')
+    match = Q()
+    for band, bucket in own:
+        match |= Q(band=band, bucket=bucket)
+    if not match:
+        return []
+
+    candidates = list(
+        RecipeBand.objects.filter(match, user_id=recipe.user_id).exclude(
+            recipe_id=recipe.id,
+        ).filter(
+            recipe__deleted_on__isnull=True,
+        ).values('recipe_id').annotate(
+            shared=Count('id'),
+        ).order_by('-shared', 'recipe_id').values_list(
+            'recipe_id', flat=True,
+        )[:CANDIDATES]
+    )
+    features = features_of([recipe.id, *candidates])
+    target = features[recipe.id]
+    scored = [
+        (candidate, jaccard(target, features[candidate]))
+        for candidate in candidates
+    ]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return [item for item in scored if item[1] > 0][:limit]
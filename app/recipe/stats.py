@@ -0,0 +1,119 @@
+"""
+Per-user recipe statistics.
+
+Computed with one aggregate query over the user's recipes plus two index
+scans for the most used tags and ingredients, then cached until the user
+writes a recipe, tag or ingredient (see recipe.signals).
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+
+from core.models import Recipe, Tag, Ingredient
+
+# histogram bucket lower bounds, the last bucket is open ended
+TIME_BUCKETS = [0, 15, 30, 60, 120]
+PRICE_BUCKETS = [Decimal(edge) for edge in (0, 5, 10, 20, 50)]
+
+TOP_LIMIT = 10
+
+
+def stats_cache_key(user_id):
+    """Return cache key of the stats of a user."""
+    return f'recipe-stats:{user_id}'
+
+
+def invalidate_stats(user_id):
+    """Drop cached stats of a user, now and again on commit."""
+    cache.delete(stats_cache_key(user_id))
+    # stats computed from the pre-commit state may be cached meanwhile
+    transaction.on_commit(lambda: cache.delete(stats_cache_key(user_id)))
+
+
+def _histogram_aggregates(field, edges):
+    """Return conditional counts per bucket, named field_<index>."""
+    aggregates = {}
+    for i, low in enumerate(edges):
+        bucket = Q(**{f'{field}__gte': low})
+        if i + 1 < len(edges):
+            bucket &= Q(**{f'{field}__lt': edges[i + 1]})
+        aggregates[f'{field}_{i}'] = Count('id', filter=bucket)
+    return aggregates
+
+
+def _histogram(row, field, edges, convert):
+    return [
+        {
+            'min': convert(low),
+            'max': convert(edges[i + 1]) if i + 1 < len(edges) else None,
+            'count': row[f'{field}_{i}'],
+        }
+        for i, low in enumerate(edges)
+    ]
+
+
+def _price(value):
+    """Format a price like the recipe serializers do."""
+    if value is None:
+        return None
+    return str(Decimal(value).quantize(Decimal('0.01')))
+
+
+def _time(value):
+    return None if value is None else round(float(value), 1)
+
+
+def _top(model, user):
+    return [
+        {'id': obj.id, 'name': obj.name, 'recipe_count': obj.recipe_count}
+        for obj in model.objects.filter(
+            user=user, recipe_count__gt=0,
+        ).order_by('-recipe_count', 'name')[:TOP_LIMIT]
+    ]
+
+
+def compute_stats(user):
+    """Return statistics of the recipes of user."""
+    row = Recipe.objects.filter(user=user).aggregate(
+        count=Count('id'),
+        time_min=Min('time_minutes'),
+        time_avg=Avg('time_minutes'),
+        time_max=Max('time_minutes'),
+        price_min=Min('price'),
+        price_avg=Avg('price'),
+        price_max=Max('price'),
+        **_histogram_aggregates('time_minutes', TIME_BUCKETS),
+        **_histogram_aggregates('price', PRICE_BUCKETS),
+    )
+    return {
+        'count': row['count'],
+        'time_minutes': {
+            'min': row['time_min'],
+            'avg': _time(row['time_avg']),
+            'max': row['time_max'],
+            'histogram': _histogram(
+                row, 'time_minutes', TIME_BUCKETS, int),
+        },
+        'price': {
+            'min': _price(row['price_min']),
+            'avg': _price(row['price_avg']),
+            'max': _price(row['price_max']),
+            'histogram': _histogram(row, 'price', PRICE_BUCKETS, _price),
+        },
+        # recipe_count is denormalized and indexed, no join needed
+        'top_tags': _top(Tag, user),
+        'top_ingredients': _top(Ingredient, user),
+    }
+
+
+def get_stats(user):
+    """Return cached statistics of user, computing them on a miss."""
+    key = stats_cache_key(user.pk)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(user)
+        cache.set(key, stats, timeout=settings.RECIPE_STATS_CACHE_TTL)
+    return stats
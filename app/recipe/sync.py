@@ -0,0 +1,107 @@
+"""
+Delta sync of recipes, tags and ingredients.
+
+A sync covers the window (since, until] of update_on / deleted_on, where
+until lags the current time by SYNC_LAG seconds so rows saved by
+transactions still in flight aren't skipped. Each stream is paginated by
+keyset on (timestamp, id) and the position of every stream is carried in
+a signed cursor, so pages stay stable while the client pages through.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient, Tombstone
+
+CURSOR_SALT = 'recipe.sync'
+
+# stream name -> (queryset of a user, timestamp field)
+STREAMS = {
+    'recipes': (
+        lambda user: Recipe.objects.filter(user=user).prefetch_related(
+            'tags', 'ingredients'),
+        'update_on',
+    ),
+    'tags': (lambda user: Tag.objects.filter(user=user), 'update_on'),
+    'ingredients': (
+        lambda user: Ingredient.objects.filter(user=user), 'update_on'),
+    'deleted': (
+        lambda user: Tombstone.objects.filter(user=user), 'deleted_on'),
+}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(state):
+    return signing.dumps(state, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    try:
+        return signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor('Invalid cursor.')
+
+
+def oldest_watermark():
+    """Return the oldest watermark still covered by tombstones."""
+    return timezone.now() - timedelta(seconds=settings.TOMBSTONE_TTL)
+
+
+def new_state(since):
+    """Return the cursor state of a sync starting at since."""
+    until = timezone.now() - timedelta(seconds=settings.SYNC_LAG)
+    return {
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat(),
+        # stream -> [timestamp, id] of the last row sent, None when done
+        'pos': {name: [None, None] for name in STREAMS},
+    }
+
+
+def _page(user, name, state, limit):
+    """Return rows of one stream after its position and the new position."""
+    get_queryset, field = STREAMS[name]
+    queryset = get_queryset(user).filter(
+        **{f'{field}__lte': datetime.fromisoformat(state['until'])})
+    if state['since']:
+        queryset = queryset.filter(
+            **{f'{field}__gt': datetime.fromisoformat(state['since'])})
+    elif name == 'deleted':
+        # a full sync has nothing to delete
+        return [], None
+
+    last, last_id = state['pos'][name]
+    if last is not None:
+        last = datetime.fromisoformat(last)
+        queryset = queryset.filter(
+            Q(**{f'{field}__gt': last})
+            | Q(**{field: last, 'id__gt': last_id}))
+
+    rows = list(queryset.order_by(field, 'id')[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, [getattr(rows[-1], field).isoformat(), rows[-1].id]
+
+
+def get_changes(user, state, limit):
+    """Return (rows per stream, next state or None when complete)."""
+    changes = {}
+    pos = {}
+    for name in STREAMS:
+        if name in state['pos']:
+            changes[name], position = _page(user, name, state, limit)
+            if position is not None:
+                pos[name] = position
+        else:
+            changes[name] = []
+
+    if not pos:
+        return changes, None
+    return changes, {**state, 'pos': pos}
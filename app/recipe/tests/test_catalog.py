@@ -0,0 +1,199 @@
+"""
+Tests for the shared tag and ingredient catalog.
+"""
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    CatalogIngredient,
+    CatalogTag,
+    Ingredient,
+    Recipe,
+    Tag,
+    Tombstone,
+)
+from recipe import catalog
+from recipe.copy import copy_recipe
+from recipe.deletion import soft_delete
+
+dedupe = import_module('core.migrations.0016_catalog_dedupe')
+
+
+def create_user(email='catalog@example.com'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(
+        email=email, password='testpass123')
+
+
+def create_recipe(user, title='Soup'):
+    """Create and return a sample recipe."""
+    return Recipe.objects.create(
+        user=user, title=title, time_minutes=10, price=Decimal('5.00'))
+
+
+class CatalogTests(TestCase):
+    """Test linking tags and ingredients to the catalog."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.other = create_user('other@example.com')
+
+    def tearDown(self):
+        # ids of rolled back rows must not leak into other tests
+        catalog.name_cache.clear()
+
+    def test_same_name_same_entry(self):
+        """Test spellings of a name of different users share an entry."""
+        salt = Ingredient.objects.create(user=self.user, name='Sea  Salt')
+        other = Ingredient.objects.create(user=self.other, name=' sea salt')
+
+        self.assertIsNotNone(salt.catalog_id)
+        self.assertEqual(salt.catalog_id, other.catalog_id)
+        self.assertEqual(salt.catalog.name, 'sea salt')
+        self.assertEqual(CatalogIngredient.objects.count(), 1)
+
+    def test_rename_relinks(self):
+        """Test renaming a tag moves it to the entry of the new name."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+
+        tag.name = 'Lunch'
+        tag.save()
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.catalog.name, 'lunch')
+
+    def test_name_cached_after_commit(self):
+        """Test committed names resolve without a query."""
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog_id = catalog.resolve(Tag, 'Vegan')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.resolve(Tag, 'VEGAN'), catalog_id)
+
+    def test_name_not_cached_before_commit(self):
+        """Test names of an uncommitted transaction aren't cached."""
+        catalog.resolve(Tag, 'Vegan')
+
+        self.assertIsNone(
+            catalog.name_cache.get((CatalogTag, 'vegan')))
+
+    def test_name_cache_bounded(self):
+        """Test the least recently used names are evicted."""
+        cache = catalog.NameCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+    def test_link_catalog(self):
+        """Test rows written without signals are linked in batches."""
+        Tag.objects.bulk_create([
+            Tag(user=self.user, name=f'tag {i % 3}') for i in range(5)])
+
+        batches = list(catalog.link_catalog(
+            Tag.objects.filter(user=self.user), batch_size=2))
+
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertFalse(Tag.objects.filter(catalog__isnull=True).exists())
+        self.assertEqual(CatalogTag.objects.count(), 3)
+
+    def test_recipe_reuses_alias(self):
+        """Test another spelling of a name reuses the user's row."""
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(reverse('recipe:recipe-list'), {
+            'title': 'Soup', 'time_minutes': 5, 'price': '1.00',
+            'ingredients': [{'name': ' salt'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [i['id'] for i in response.data['ingredients']], [salt.id])
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(), 1)
+
+    def test_copy_keeps_catalog(self):
+        """Test tags created by a copy to another user are linked."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        recipe.tags.add(tag)
+
+        new_id, = copy_recipe(recipe, self.other)
+
+        copied = Recipe.objects.get(id=new_id).tags.get()
+        self.assertEqual(copied.catalog_id, tag.catalog_id)
+
+
+class CatalogMigrationTests(TestCase):
+    """Test the migration building the catalog from existing rows."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.duplicate = Ingredient.objects.create(
+            user=self.user, name='salt ')
+        self.soup = create_recipe(self.user)
+        self.soup.ingredients.add(self.salt, self.duplicate)
+        self.stew = create_recipe(self.user, title='Stew')
+        self.stew.ingredients.add(self.duplicate)
+        other = create_user('other@example.com')
+        self.other_salt = Ingredient.objects.create(user=other, name='SALT')
+        # as before the catalog existed
+        Ingredient.objects.update(catalog=None)
+        CatalogIngredient.objects.all().delete()
+
+    def tearDown(self):
+        catalog.name_cache.clear()
+
+    def test_links_catalog(self):
+        """Test every row is linked to the entry of its name."""
+        dedupe.build_catalog(apps, None)
+
+        entry = CatalogIngredient.objects.get()
+        self.assertEqual(entry.name, 'salt')
+        self.assertEqual(
+            set(entry.aliases.values_list('id', flat=True)),
+            {self.salt.id, self.other_salt.id})
+
+    def test_merges_duplicates(self):
+        """Test a user's duplicates are merged into the oldest row."""
+        dedupe.build_catalog(apps, None)
+
+        self.assertFalse(
+            Ingredient.all_objects.filter(id=self.duplicate.id).exists())
+        self.assertEqual(list(self.soup.ingredients.all()), [self.salt])
+        self.assertEqual(list(self.stew.ingredients.all()), [self.salt])
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.recipe_count, 2)
+        self.assertTrue(Tombstone.objects.filter(
+            kind=Tombstone.INGREDIENT, object_id=self.duplicate.id).exists())
+
+    def test_merged_count_live_recipes(self):
+        """Test the merged row's count skips soft deleted recipes."""
+        soft_delete(self.stew)
+
+        dedupe.build_catalog(apps, None)
+
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.recipe_count, 1)
+
+    def test_rerun(self):
+        """Test running again after an interruption changes nothing."""
+        dedupe.build_catalog(apps, None)
+        dedupe.build_catalog(apps, None)
+
+        self.assertEqual(Ingredient.objects.count(), 2)
+        self.assertEqual(CatalogIngredient.objects.count(), 1)
@@ -0,0 +1,144 @@
+"""
+Tests for soft delete and purge of recipes, tags and ingredients.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient, Tombstone
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def purge():
+    """Run purge_deleted once."""
+    call_command('purge_deleted', batch_size=2, stdout=StringIO())
+
+
+@override_settings(PURGE_DELETED_AFTER=0)
+class SoftDeleteTests(TestCase):
+    """Test deleting through the API and purging later."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='delete@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Dinner')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name='Salt')
+        self.recipe = create_recipe(self.user)
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+
+    def test_delete_recipe_is_soft(self):
+        """Test deleting a recipe hides it but keeps the row."""
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(url).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Recipe.objects.filter(id=self.recipe.id).exists())
+        self.assertTrue(
+            Recipe.all_objects.filter(id=self.recipe.id).exists())
+        self.assertEqual(
+            Tombstone.objects.filter(object_id=self.recipe.id).count(), 1)
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.recipe_count, 0)
+
+    def test_delete_tag_is_soft(self):
+        """Test a deleted tag disappears from lists and recipes."""
+        response = self.client.delete(
+            reverse('recipe:tag-detail', args=[self.tag.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.client.get(reverse('recipe:tag-list')).data, [])
+        recipe = self.client.get(
+            reverse('recipe:recipe-detail', args=[self.recipe.id])).data
+        self.assertEqual(recipe['tags'], [])
+
+    def test_purge_recipes(self):
+        """Test purge removes soft deleted recipes and their links."""
+        recipes = [self.recipe] + [create_recipe(self.user) for _ in range(4)]
+        for recipe in recipes:
+            recipe.tags.add(self.tag)
+            self.client.delete(
+                reverse('recipe:recipe-detail', args=[recipe.id]))
+        kept = create_recipe(self.user)
+        kept.tags.add(self.tag)
+
+        purge()
+
+        self.assertEqual(list(Recipe.all_objects.all()), [kept])
+        self.assertEqual(Recipe.tags.through.objects.count(), 1)
+        # released once by the soft delete, not again by the purge
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.recipe_count, 1)
+        self.assertEqual(Tombstone.objects.count(), 5)
+
+    def test_purge_tag_with_links(self):
+        """Test purging a tag deletes its links in batches."""
+        for _ in range(4):
+            create_recipe(self.user).tags.add(self.tag)
+        self.client.delete(reverse('recipe:tag-detail', args=[self.tag.id]))
+
+        purge()
+
+        self.assertFalse(Tag.all_objects.filter(id=self.tag.id).exists())
+        self.assertEqual(Recipe.tags.through.objects.count(), 0)
+        self.assertEqual(Recipe.objects.count(), 5)
+
+    @override_settings(PURGE_DELETED_AFTER=3600)
+    def test_purge_waits_for_grace_period(self):
+        """Test rows deleted recently are kept."""
+        self.client.delete(
+            reverse('recipe:recipe-detail', args=[self.recipe.id]))
+
+        purge()
+
+        self.assertTrue(
+            Recipe.all_objects.filter(id=self.recipe.id).exists())
+
+    @override_settings(TOMBSTONE_TTL=3600)
+    def test_purge_expired_tombstones(self):
+        """Test tombstones older than TOMBSTONE_TTL are purged."""
+        self.client.delete(
+            reverse('recipe:recipe-detail', args=[self.recipe.id]))
+        Tombstone.objects.update(
+            deleted_on=timezone.now() - timedelta(hours=2))
+
+        purge()
+
+        self.assertFalse(Tombstone.objects.exists())
+
+    @override_settings(TOMBSTONE_TTL=3600)
+    def test_sync_expired_watermark(self):
+        """Test syncing from a watermark older than tombstones is refused."""
+        since = timezone.now() - timedelta(hours=2)
+
+        response = self.client.get(
+            reverse('recipe:sync'), {'since': since.isoformat()})
+
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
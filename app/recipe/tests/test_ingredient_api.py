@@ -102,6 +102,27 @@ class PrivateIngredientTest(TestCase):
         ingredients.refresh_from_db()
         self.assertEqual(ingredients.name, payload['name'])
 
+    def test_rename_onto_existing_name_rejected(self):
+        """Test a rename can't duplicate another spelling of a name."""
+        Ingredient.objects.create(user=self.user, name='Dinner')
+        ingredient = Ingredient.objects.create(user=self.user, name='Lunch')
+
+        response = self.client.patch(
+            detail_url(ingredient.id), {'name': 'dinner '})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        ingredient.refresh_from_db()
+        self.assertEqual(ingredient.name, 'Lunch')
+
+    def test_rename_own_spelling(self):
+        """Test a row can change the spelling of its own name."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Dinner')
+
+        response = self.client.patch(
+            detail_url(ingredient.id), {'name': 'dinner'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_delete_ingredients(self):
         """Test delete a Inggredients."""
 
@@ -129,6 +150,7 @@ class PrivateIngredientTest(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
+        in1.refresh_from_db()
         s1 = IngredientSerializer(in1)
         s2 = IngredientSerializer(in2)
         self.assertIn(s1.data, res.data)
@@ -0,0 +1,100 @@
+"""
+Tests for finding recipes cookable from a set of ingredients.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Ingredient
+from recipe.deletion import soft_delete
+
+COOKABLE_URL = reverse('recipe:recipe-cookable')
+
+
+class CookableApiTests(TestCase):
+    """Test the cookable recipes action."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='pantry@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.items = {
+            name: Ingredient.objects.create(user=self.user, name=name)
+            for name in ['Eggs', 'Milk', 'Flour', 'Sugar', 'Salt']
+        }
+        self.omelette = self.create_recipe('Omelette', ['Eggs', 'Salt'])
+        self.pancakes = self.create_recipe(
+            'Pancakes', ['Eggs', 'Milk', 'Flour', 'Sugar'])
+        self.boiled = self.create_recipe('Boiled eggs', ['Eggs'])
+
+    def create_recipe(self, title, ingredients):
+        recipe = Recipe.objects.create(
+            user=self.user, title=title, time_minutes=10,
+            price=Decimal('5.00'))
+        recipe.ingredients.add(*[self.items[name] for name in ingredients])
+        return recipe
+
+    def get(self, names, **params):
+        ids = ','.join(str(self.items[name].id) for name in names)
+        return self.client.get(COOKABLE_URL, {'ingredients': ids, **params})
+
+    def test_fully_covered(self):
+        """Test only recipes with every ingredient at hand are returned."""
+        response = self.get(['Eggs', 'Salt'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['id'] for r in response.data],
+            [self.boiled.id, self.omelette.id])
+        self.assertEqual(response.data[0]['coverage'], 1.0)
+        self.assertEqual(response.data[0]['missing'], [])
+
+    def test_missing_allowed(self):
+        """Test recipes lacking a few ingredients, ranked by coverage."""
+        response = self.get(['Eggs', 'Milk', 'Flour'], missing=1)
+
+        self.assertEqual(
+            [r['id'] for r in response.data],
+            [self.boiled.id, self.pancakes.id, self.omelette.id])
+        self.assertEqual(response.data[1]['coverage'], 0.75)
+        self.assertEqual(
+            response.data[1]['missing'], [self.items['Sugar'].id])
+
+    def test_deleted_ingredient_not_required(self):
+        """Test soft deleted ingredients don't count as missing."""
+        soft_delete(self.items['Salt'])
+
+        response = self.get(['Eggs'])
+
+        self.assertIn(self.omelette.id, [r['id'] for r in response.data])
+
+    def test_other_users_recipes_excluded(self):
+        """Test only the user's own recipes are returned."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        recipe = Recipe.objects.create(
+            user=other, title='Eggs', time_minutes=1, price=Decimal('1'))
+        recipe.ingredients.add(self.items['Eggs'])
+
+        response = self.get(['Eggs'])
+
+        self.assertNotIn(recipe.id, [r['id'] for r in response.data])
+
+    def test_invalid_ingredients(self):
+        """Test a malformed ingredient list is rejected."""
+        response = self.client.get(COOKABLE_URL, {'ingredients': '1,x'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count(self):
+        """Test the lookup runs a fixed number of queries."""
+        with self.assertNumQueries(3):
+            self.get(['Eggs', 'Milk', 'Flour'], missing=2)
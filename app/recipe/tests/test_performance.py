@@ -0,0 +1,274 @@
+"""
+Query count and serializer performance tests for recipe APIs.
+"""
+import io
+import json
+import os
+import timeit
+
+from decimal import Decimal
+from unittest import skipUnless
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+from core.tests.utils import QueryCountMixin
+from recipe.serializer import RecipeSerializer, RecipeDetailSerializer
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__),
+                              'perf_baselines.json')
+
+# serializer time may grow this much over the stored baseline
+BASELINE_TOLERANCE = 1.5
+
+
+def create_recipes(user, count):
+    """Create recipes each with two tags and two ingredients."""
+    recipes = []
+    for i in range(count):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=10,
+            price=Decimal('5.00'),
+        )
+        tags = [
+            Tag.objects.create(user=user, name=f'tag {recipe.id}-{j}')
+            for j in range(2)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                user=user, name=f'ingredient {recipe.id}-{j}')
+            for j in range(2)
+        ]
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+        recipes.append(recipe)
+    return recipes
+
+
+def image_file():
+    """Return a small in-memory JPEG for upload."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10)).save(buffer, format='JPEG')
+    buffer.name = 'image.jpg'
+    buffer.seek(0)
+    return buffer
+
+
+class RecipeQueryCountTests(QueryCountMixin, TestCase):
+    """Test query count of every recipe route doesn't grow with data."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='perf@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipes(self.user, 1)[0]
+        self.tag = self.recipe.tags.first()
+        self.ingredient = self.recipe.ingredients.first()
+
+    def tearDown(self):
+        for recipe in Recipe.objects.exclude(image=''):
+            recipe.image.delete()
+
+    def add_data(self):
+        create_recipes(self.user, 99)
+
+    def test_api_root(self):
+        """Test API root needs no queries."""
+        self.assertQueriesBounded(
+            0, lambda: self.client.get(reverse('recipe:api-root')))
+
+    def test_recipe_list(self):
+        """Test listing recipes prefetches tags and ingredients."""
+        self.assertQueriesBounded(
+            3, lambda: self.client.get(reverse('recipe:recipe-list')))
+
+    def test_recipe_list_filtered(self):
+        """Test filtering recipes by tags and ingredients."""
+        url = reverse('recipe:recipe-list')
+        self.assertQueriesBounded(3, lambda: self.client.get(
+            url, {'tags': self.tag.id, 'ingredients': self.ingredient.id}))
+
+    def test_recipe_create(self):
+        """Test creating a recipe with tags and ingredients."""
+        payload = {
+            'title': 'New recipe',
+            'time_minutes': 5,
+            'price': '2.50',
+            'tags': [{'name': self.tag.name}],
+            'ingredients': [{'name': self.ingredient.name}],
+        }
+        # includes 2 catalog queries per name, the name cache is cold
+        self.assertQueriesBounded(17, lambda: self.client.post(
+            reverse('recipe:recipe-list'), payload, format='json'),
+            status.HTTP_201_CREATED)
+
+    def test_recipe_detail(self):
+        """Test retrieving a recipe."""
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        self.assertQueriesBounded(3, lambda: self.client.get(url))
+
+    def test_recipe_partial_update(self):
+        """Test partial update of a recipe."""
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        self.assertQueriesBounded(
+            9, lambda: self.client.patch(url, {'title': 'Updated'}))
+
+    def test_recipe_full_update(self):
+        """Test full update of a recipe."""
+        url = reverse('recipe:recipe-detail', args=[self.recipe.id])
+        payload = {
+            'title': 'Updated',
+            'time_minutes': 5,
+            'price': '2.50',
+            'tags': [{'name': self.tag.name}],
+            'ingredients': [{'name': self.ingredient.name}],
+        }
+        # includes 2 catalog queries per name, the name cache is cold
+        self.assertQueriesBounded(
+            26, lambda: self.client.put(url, payload, format='json'))
+
+    def test_recipe_upload_image(self):
+        """Test uploading a recipe image."""
+        url = reverse('recipe:recipe-upload-image', args=[self.recipe.id])
+        self.assertQueriesBounded(4, lambda: self.client.post(
+            url, {'image': image_file()}, format='multipart'))
+
+    def test_recipe_delete(self):
+        """Test deleting a recipe."""
+        targets = iter(create_recipes(self.user, 2))
+        self.assertQueriesBounded(9, lambda: self.client.delete(
+            reverse('recipe:recipe-detail', args=[next(targets).id])),
+            status.HTTP_204_NO_CONTENT)
+
+    def test_recipe_stats(self):
+        """Test recipe stats aggregate in a fixed number of queries."""
+        url = reverse('recipe:recipe-stats')
+        self.assertQueriesBounded(3, lambda: self.client.get(url))
+
+    def test_tag_list(self):
+        """Test listing tags."""
+        self.assertQueriesBounded(
+            1, lambda: self.client.get(reverse('recipe:tag-list')))
+
+    def test_tag_list_assigned_only(self):
+        """Test listing tags assigned to recipes."""
+        self.assertQueriesBounded(1, lambda: self.client.get(
+            reverse('recipe:tag-list'), {'assigned_only': 1}))
+
+    def test_tag_update(self):
+        """Test updating a tag."""
+        url = reverse('recipe:tag-detail', args=[self.tag.id])
+        # + duplicate name check, catalog insert and lookup (the name
+        # cache is cold in tests)
+        self.assertQueriesBounded(
+            5, lambda: self.client.patch(url, {'name': 'Renamed'}))
+
+    def test_tag_delete(self):
+        """Test deleting a tag."""
+        targets = iter([r.tags.first() for r in create_recipes(self.user, 2)])
+        self.assertQueriesBounded(5, lambda: self.client.delete(reverse(
+            'recipe:tag-detail', args=[next(targets).id])),
+            status.HTTP_204_NO_CONTENT)
+
+    def test_ingredient_list(self):
+        """Test listing ingredients."""
+        self.assertQueriesBounded(
+            1, lambda: self.client.get(reverse('recipe:ingredient-list')))
+
+    def test_ingredient_update(self):
+        """Test updating an ingredient."""
+        url = reverse('recipe:ingredient-detail', args=[self.ingredient.id])
+        # + duplicate name check, catalog insert and lookup (the name
+        # cache is cold in tests)
+        self.assertQueriesBounded(
+            5, lambda: self.client.patch(url, {'name': 'Renamed'}))
+
+    def test_ingredient_delete(self):
+        """Test deleting an ingredient."""
+        targets = iter([
+            r.ingredients.first() for r in create_recipes(self.user, 2)
+        ])
+        self.assertQueriesBounded(5, lambda: self.client.delete(reverse(
+            'recipe:ingredient-detail', args=[next(targets).id])),
+            status.HTTP_204_NO_CONTENT)
+
+
+def calibrate():
+    """Time a fixed pure Python workload to normalize for machine speed."""
+    return min(timeit.repeat(
+        lambda: sum(i * i for i in range(20000)), number=5, repeat=5))
+
+
+def load_baselines():
+    """Return stored serializer baselines."""
+    if not os.path.exists(BASELINES_FILE):
+        return {}
+    with open(BASELINES_FILE) as f:
+        return json.load(f)
+
+
+@skipUnless(os.environ.get('PERF_TESTS'), 'Set PERF_TESTS=1 to run.')
+class SerializerBenchmarkTests(TestCase):
+    """Compare serializer CPU time against stored baselines.
+
+    Times are stored relative to a calibration loop so baselines can be
+    shared between machines. Run with PERF_BASELINES_UPDATE=1 to store
+    new baselines after an intended change.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            email='bench@example.com',
+            password='testpass123',
+        )
+        create_recipes(user, 100)
+
+    def assertWithinBaseline(self, name, func):
+        """Assert func isn't slower than its baseline allows."""
+        ratio = min(timeit.repeat(func, number=5, repeat=5)) / calibrate()
+        baselines = load_baselines()
+
+        if os.environ.get('PERF_BASELINES_UPDATE'):
+            baselines[name] = round(ratio, 4)
+            with open(BASELINES_FILE, 'w') as f:
+                json.dump(baselines, f, indent=2, sort_keys=True)
+                f.write('\n')
+            return
+
+        if name not in baselines:
+            self.skipTest(f'No baseline stored for {name}.')
+        self.assertLessEqual(
+            ratio, baselines[name] * BASELINE_TOLERANCE,
+            f'{name} is {ratio / baselines[name]:.2f}x its baseline',
+        )
+
+    def test_recipe_list_serializer(self):
+        """Test serializing a list of 100 recipes."""
+        recipes = list(
+            Recipe.objects.prefetch_related('tags', 'ingredients'))
+        self.assertWithinBaseline(
+            'recipe_list_100',
+            lambda: RecipeSerializer(recipes, many=True).data,
+        )
+
+    def test_recipe_detail_serializer(self):
+        """Test serializing a recipe detail."""
+        recipe = Recipe.objects.prefetch_related(
+            'tags', 'ingredients').first()
+        self.assertWithinBaseline(
+            'recipe_detail',
+            lambda: RecipeDetailSerializer(recipe).data,
+        )
@@ -0,0 +1,200 @@
+"""
+Tests for the public recipe feed.
+"""
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe import public
+from recipe.deletion import soft_delete
+
+FEED_URL = reverse('recipe:public-recipe-list')
+
+
+def detail_url(recipe_id):
+    """Create and return a public recipe URL."""
+    return reverse('recipe:public-recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PublicRecipeApiTests(TestCase):
+    """Test reading shared recipes without authentication."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='share@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.recipe = create_recipe(
+            self.user, title='Shared soup', is_public=True)
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Soup'))
+        self.private = create_recipe(self.user, title='Private')
+
+    def test_feed_lists_public_recipes(self):
+        """Test the feed lists shared recipes only, without the owner."""
+        response = self.client.get(FEED_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['title'] for r in response.data],
+                         ['Shared soup'])
+        self.assertEqual(response.data[0]['tags'], ['Soup'])
+        self.assertNotIn('user', response.data[0])
+
+    def test_private_recipe_not_found(self):
+        """Test a private recipe isn't served publicly."""
+        response = self.client.get(detail_url(self.private.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cache_headers(self):
+        """Test responses can be cached by browsers and CDNs."""
+        with self.settings(PUBLIC_RECIPE_MAX_AGE=30):
+            response = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=30', response['Cache-Control'])
+        self.assertTrue(response['ETag'])
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match gets a 304."""
+        etag = self.client.get(detail_url(self.recipe.id))['ETag']
+
+        response = self.client.get(
+            detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_reads_skip_database(self):
+        """Test repeated reads are served from the cache."""
+        self.client.get(FEED_URL)
+        self.client.get(detail_url(self.recipe.id))
+
+        with self.assertNumQueries(0):
+            self.client.get(FEED_URL)
+            self.client.get(detail_url(self.recipe.id))
+
+    def test_update_invalidates(self):
+        """Test changes of a shared recipe show up immediately."""
+        self.client.get(detail_url(self.recipe.id))
+        self.client.get(FEED_URL)
+        self.recipe.title = 'Better soup'
+        self.recipe.save()
+
+        response = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(response.data['title'], 'Better soup')
+        self.assertEqual(
+            self.client.get(FEED_URL).data[0]['title'], 'Better soup')
+
+    def test_unshare_invalidates(self):
+        """Test an unshared recipe leaves the feed."""
+        self.client.get(FEED_URL)
+        recipe = Recipe.objects.get(id=self.recipe.id)
+        recipe.is_public = False
+        recipe.save()
+
+        self.assertEqual(self.client.get(FEED_URL).data, [])
+        self.assertEqual(
+            self.client.get(detail_url(recipe.id)).status_code,
+            status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_recipe_leaves_feed(self):
+        """Test a soft deleted shared recipe leaves the feed."""
+        self.client.get(FEED_URL)
+        soft_delete(self.recipe)
+
+        self.assertEqual(self.client.get(FEED_URL).data, [])
+
+    def test_feed_page_limited(self):
+        """Test pages past the limit are rejected."""
+        with self.settings(PUBLIC_FEED_MAX_PAGES=2):
+            response = self.client.get(FEED_URL, {'page': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SingleFlightTests(TestCase):
+    """Test recomputation of cache entries."""
+
+    def setUp(self):
+        cache.clear()
+        self.key = 'single-flight-test'
+
+    def test_miss_computes(self):
+        """Test a miss computes and caches the entry."""
+        compute = mock.Mock(return_value={'a': 1})
+
+        public.get_or_compute(self.key, compute)
+        entry = public.get_or_compute(self.key, compute)
+
+        self.assertEqual(entry['data'], {'a': 1})
+        compute.assert_called_once()
+
+    def test_stale_served_while_locked(self):
+        """Test others get the stale entry while one recomputes."""
+        cache.set(self.key, {'data': 'old', 'etag': '"x"',
+                             'fresh_until': time.time() - 1})
+        cache.add(f'{self.key}:lock', 1)
+        compute = mock.Mock()
+
+        entry = public.get_or_compute(self.key, compute)
+
+        self.assertEqual(entry['data'], 'old')
+        compute.assert_not_called()
+
+    def test_stale_recomputed_by_lock_holder(self):
+        """Test a stale entry is refreshed by the request taking the lock."""
+        cache.set(self.key, {'data': 'old', 'etag': '"x"',
+                             'fresh_until': time.time() - 1})
+
+        entry = public.get_or_compute(self.key, lambda: 'new')
+
+        self.assertEqual(entry['data'], 'new')
+        self.assertIsNone(cache.get(f'{self.key}:lock'))
+
+    @mock.patch('recipe.public.LOCK_TIMEOUT', 0.2)
+    def test_miss_waits_for_lock_holder(self):
+        """Test a cold miss waits instead of computing in parallel."""
+        cache.add(f'{self.key}:lock', 1)
+        compute = mock.Mock(return_value='fallback')
+
+        def fill(seconds):
+            cache.set(self.key, {'data': 'filled', 'etag': '"x"',
+                                 'fresh_until': time.time() + 60})
+
+        with mock.patch('recipe.public.time.sleep', side_effect=fill):
+            entry = public.get_or_compute(self.key, compute)
+
+        self.assertEqual(entry['data'], 'filled')
+        compute.assert_not_called()
+
+    @mock.patch('recipe.public.LOCK_TIMEOUT', 0.05)
+    def test_dead_lock_holder(self):
+        """Test waiters compute themselves when the lock holder is gone."""
+        cache.add(f'{self.key}:lock', 1)
+
+        entry = public.get_or_compute(self.key, lambda: 'computed')
+
+        self.assertEqual(entry['data'], 'computed')
@@ -4,6 +4,8 @@ Test for recipe APIs.
 import tempfile
 import os
 
+from datetime import timedelta
+
 from PIL import Image
 
 from decimal import Decimal
@@ -507,6 +509,52 @@ class PrivateRecipeAPITests(TestCase):
         self.assertIn(serializer_ice_cream.data, response.data)
         self.assertNotIn(serializer_fish_chips.data, response.data)
 
+    def test_filter_by_ranges(self):
+        """Test filtering recipes by time and price ranges."""
+        quick = create_recipe(
+            user=self.user, time_minutes=10, price=Decimal('3.00'))
+        create_recipe(user=self.user, time_minutes=10, price=Decimal('9.00'))
+        create_recipe(user=self.user, time_minutes=90, price=Decimal('3.00'))
+
+        params = {'time_max': 30, 'price_min': '1.00', 'price_max': '5.00'}
+        response = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in response.data], [quick.id])
+
+    def test_filter_by_created_window(self):
+        """Test filtering recipes by creation time."""
+        old = create_recipe(user=self.user)
+        new = create_recipe(user=self.user)
+        Recipe.objects.filter(id=old.id).update(
+            create_on=new.create_on - timedelta(days=2))
+
+        params = {'created_after': new.create_on - timedelta(days=1)}
+        response = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual([r['id'] for r in response.data], [new.id])
+
+    def test_ordering(self):
+        """Test sorting recipes by a whitelisted key."""
+        slow = create_recipe(user=self.user, time_minutes=60)
+        quick = create_recipe(user=self.user, time_minutes=5)
+        medium = create_recipe(user=self.user, time_minutes=30)
+
+        response = self.client.get(RECIPE_URL, {'ordering': 'time_minutes'})
+
+        self.assertEqual(
+            [r['id'] for r in response.data],
+            [quick.id, medium.id, slow.id],
+        )
+
+    def test_invalid_filter_rejected(self):
+        """Test unknown sort keys and malformed ranges return 400."""
+        for params in ({'ordering': 'description'}, {'price_min': 'cheap'}):
+            response = self.client.get(RECIPE_URL, params)
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class ImageUploadTest(TestCase):
     """Test for image upload API."""
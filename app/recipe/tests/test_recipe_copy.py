@@ -0,0 +1,228 @@
+"""
+Tests for copying recipes.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, RecipeShare, Tag, Ingredient
+from recipe.copy import copy_recipe
+from recipe.deletion import soft_delete
+
+SHARES_URL = reverse('recipe:recipeshare-list')
+
+
+def copy_url(recipe_id):
+    """Create and return the copy URL of a recipe."""
+    return reverse('recipe:recipe-copy', args=[recipe_id])
+
+
+def accept_url(share_id):
+    """Create and return the accept URL of a share."""
+    return reverse('recipe:recipeshare-accept', args=[share_id])
+
+
+class RecipeCopyTests(TestCase):
+    """Test the recipe copy action."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='copy@example.com',
+            password='testpass123',
+        )
+        self.other = get_user_model().objects.create_user(
+            email='friend@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Dinner')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name='Salt')
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            time_minutes=20,
+            price=Decimal('4.50'),
+            description='Hot.',
+            image='uploads/recipe/soup.jpg',
+        )
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+
+    def test_copy_recipe(self):
+        """Test a copy has the fields and links of the original."""
+        response = self.client.post(copy_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 1)
+        copy = Recipe.objects.get(id=response.data[0]['id'])
+        self.assertNotEqual(copy.id, self.recipe.id)
+        self.assertEqual(copy.user, self.user)
+        self.assertEqual(copy.title, 'Soup')
+        self.assertEqual(copy.price, Decimal('4.50'))
+        self.assertEqual(copy.image.name, self.recipe.image.name)
+        self.assertEqual(list(copy.tags.all()), [self.tag])
+        self.assertEqual(list(copy.ingredients.all()), [self.ingredient])
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.recipe_count, 2)
+
+    def test_copy_many(self):
+        """Test making several copies in one request."""
+        response = self.client.post(copy_url(self.recipe.id), {'count': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Recipe.objects.filter(title='Soup').count(), 4)
+        self.ingredient.refresh_from_db()
+        self.assertEqual(self.ingredient.recipe_count, 4)
+
+    def test_copy_counts_live_recipes(self):
+        """Test recounts after a copy skip soft deleted recipes."""
+        deleted = Recipe.objects.create(
+            user=self.user, title='Old', time_minutes=5,
+            price=Decimal('1.00'))
+        deleted.tags.add(self.tag)
+        soft_delete(deleted)
+
+        self.client.post(copy_url(self.recipe.id))
+
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.recipe_count, 2)
+
+    def test_copy_count_limited(self):
+        """Test the number of copies is bounded."""
+        with self.settings(RECIPE_COPY_MAX=2):
+            response = self.client.post(
+                copy_url(self.recipe.id), {'count': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_share_needs_acceptance(self):
+        """Test offering a recipe creates nothing until it's accepted."""
+        response = self.client.post(
+            copy_url(self.recipe.id), {'to': self.other.email})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Recipe.objects.filter(user=self.other).exists())
+        share = RecipeShare.objects.get()
+        self.assertEqual(share.recipient, self.other)
+
+    def test_accept_share(self):
+        """Test accepting copies the recipe, reusing or creating tags."""
+        own_tag = Tag.objects.create(user=self.other, name='Dinner')
+        self.client.post(copy_url(self.recipe.id), {'to': self.other.email})
+        client = APIClient()
+        client.force_authenticate(self.other)
+
+        shares = client.get(SHARES_URL).data
+        response = client.post(accept_url(shares[0]['id']))
+
+        self.assertEqual(shares[0]['title'], 'Soup')
+        self.assertEqual(shares[0]['sender'], self.user.email)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        copy = Recipe.objects.get(id=response.data[0]['id'])
+        self.assertEqual(copy.user, self.other)
+        self.assertEqual(list(copy.tags.all()), [own_tag])
+        ingredient = copy.ingredients.get()
+        self.assertEqual(ingredient.user, self.other)
+        self.assertEqual(ingredient.name, 'Salt')
+        self.assertEqual(ingredient.recipe_count, 1)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(), 1)
+        self.assertFalse(RecipeShare.objects.exists())
+
+    def test_copy_reuses_other_spelling(self):
+        """Test the recipient's row of a name is reused whatever its case."""
+        own_salt = Ingredient.objects.create(user=self.other, name='salt')
+
+        new_id, = copy_recipe(self.recipe, self.other)
+
+        copy = Recipe.objects.get(id=new_id)
+        self.assertEqual(list(copy.ingredients.all()), [own_salt])
+        self.assertEqual(
+            list(Ingredient.objects.filter(user=self.other)), [own_salt])
+
+    def test_decline_share(self):
+        """Test the recipient can decline, others can't touch the share."""
+        self.client.post(copy_url(self.recipe.id), {'to': self.other.email})
+        share = RecipeShare.objects.get()
+        url = reverse('recipe:recipeshare-detail', args=[share.id])
+
+        self.assertEqual(self.client.delete(url).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        client = APIClient()
+        client.force_authenticate(self.other)
+        self.assertEqual(client.delete(url).status_code,
+                         status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Recipe.objects.filter(user=self.other).exists())
+
+    def test_share_to_unknown_user(self):
+        """Test unknown emails get the same answer as registered ones."""
+        known = self.client.post(
+            copy_url(self.recipe.id), {'to': self.other.email})
+        unknown = self.client.post(
+            copy_url(self.recipe.id), {'to': 'nobody@example.com'})
+
+        self.assertEqual(unknown.status_code, known.status_code)
+        self.assertEqual(unknown.data, known.data)
+        self.assertEqual(RecipeShare.objects.count(), 1)
+
+    def test_share_single_copy(self):
+        """Test a share can't carry several copies."""
+        response = self.client.post(
+            copy_url(self.recipe.id), {'to': self.other.email, 'count': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+        'DEFAULT_THROTTLE_RATES': {'recipe_share': '2/h'},
+    })
+    def test_share_throttled(self):
+        """Test offering recipes is throttled per user, copies aren't."""
+        cache.clear()
+        url = copy_url(self.recipe.id)
+        for _ in range(2):
+            self.client.post(url, {'to': self.other.email})
+
+        response = self.client.post(url, {'to': self.other.email})
+        copy = self.client.post(url)
+        cache.clear()
+
+        self.assertEqual(response.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(copy.status_code, status.HTTP_201_CREATED)
+
+    def test_copy_other_users_recipe(self):
+        """Test another user's recipe can't be copied."""
+        recipe = Recipe.objects.create(
+            user=self.other, title='Secret', time_minutes=5,
+            price=Decimal('1.00'))
+
+        response = self.client.post(copy_url(recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Recipe.objects.filter(title='Secret').count(), 1)
+
+    def test_copy_queries_constant(self):
+        """Test the copy runs the same queries for one or many copies."""
+        for name in ['Lunch', 'Vegan', 'Quick']:
+            self.recipe.tags.add(Tag.objects.create(user=self.user, name=name))
+        url = copy_url(self.recipe.id)
+
+        with CaptureQueriesContext(connection) as one:
+            self.client.post(url, {'count': 1})
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(url, {'count': 10})
+
+        self.assertEqual(len(one), len(many))
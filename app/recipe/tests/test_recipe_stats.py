@@ -0,0 +1,117 @@
+"""
+Tests for the recipe stats API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+
+STATS_URL = reverse('recipe:recipe-stats')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeStatsApiTests(TestCase):
+    """Test the recipe stats endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='stats@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_auth_required(self):
+        """Test authentication is required for stats."""
+        response = APIClient().get(STATS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_empty(self):
+        """Test stats of a user without recipes."""
+        response = self.client.get(STATS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+        self.assertIsNone(response.data['price']['avg'])
+        self.assertEqual(response.data['top_tags'], [])
+
+    def test_aggregates(self):
+        """Test counts, min/avg/max, histograms and top tags."""
+        recipes = [
+            create_recipe(self.user, time_minutes=10, price=Decimal('4.00')),
+            create_recipe(self.user, time_minutes=20, price=Decimal('6.00')),
+            create_recipe(self.user, time_minutes=150, price=Decimal('8.50')),
+        ]
+        dinner = Tag.objects.create(user=self.user, name='Dinner')
+        quick = Tag.objects.create(user=self.user, name='Quick')
+        dinner.recipe_set.add(*recipes)
+        quick.recipe_set.add(recipes[0])
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        create_recipe(other, time_minutes=500)
+
+        data = self.client.get(STATS_URL).data
+
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['time_minutes']['min'], 10)
+        self.assertEqual(data['time_minutes']['avg'], 60.0)
+        self.assertEqual(data['time_minutes']['max'], 150)
+        self.assertEqual(
+            [b['count'] for b in data['time_minutes']['histogram']],
+            [1, 1, 0, 0, 1],
+        )
+        self.assertEqual(data['price']['min'], '4.00')
+        self.assertEqual(data['price']['avg'], '6.17')
+        self.assertEqual(data['price']['max'], '8.50')
+        self.assertEqual(
+            [b['count'] for b in data['price']['histogram']],
+            [1, 2, 0, 0, 0],
+        )
+        self.assertEqual(
+            [(t['name'], t['recipe_count']) for t in data['top_tags']],
+            [('Dinner', 3), ('Quick', 1)],
+        )
+
+    def test_cached_until_write(self):
+        """Test stats are served from cache until the user writes."""
+        create_recipe(self.user)
+        self.client.get(STATS_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(STATS_URL)
+        self.assertEqual(response.data['count'], 1)
+
+        create_recipe(self.user)
+        response = self.client.get(STATS_URL)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_tag_change_invalidates(self):
+        """Test adding a tag to a recipe refreshes the top tags."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.client.get(STATS_URL)
+
+        recipe.tags.add(tag)
+        response = self.client.get(STATS_URL)
+
+        self.assertEqual(response.data['top_tags'][0]['name'], 'Vegan')
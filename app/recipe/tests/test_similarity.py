@@ -0,0 +1,163 @@
+"""
+Tests for the recipe similarity index.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, RecipeBand, Ingredient
+from recipe import similarity
+from recipe.deletion import soft_delete
+
+
+def similar_url(recipe_id):
+    """Create and return the similar recipes URL of a recipe."""
+    return reverse('recipe:recipe-similar', args=[recipe_id])
+
+
+def update_index(**options):
+    """Run update_similarity once."""
+    call_command('update_similarity', stdout=StringIO(), **options)
+
+
+class MinHashTests(TestCase):
+    """Test signatures and buckets."""
+
+    def test_same_features_same_buckets(self):
+        """Test equal sets land in the same buckets."""
+        self.assertEqual(similarity.buckets({'i1', 'i2', 't3'}),
+                         similarity.buckets({'t3', 'i2', 'i1'}))
+        self.assertEqual(len(similarity.buckets({'i1'})), similarity.BANDS)
+
+    def test_no_features_no_buckets(self):
+        """Test a recipe without tags or ingredients isn't indexed."""
+        self.assertEqual(similarity.buckets(set()), [])
+
+    def test_jaccard(self):
+        """Test the exact similarity score."""
+        self.assertEqual(similarity.jaccard({1, 2, 3}, {2, 3, 4}), 0.5)
+        self.assertEqual(similarity.jaccard(set(), set()), 0.0)
+
+
+class SimilarRecipesApiTests(TestCase):
+    """Test the similar recipes action."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='similar@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pantry = {
+            name: Ingredient.objects.create(user=self.user, name=name)
+            for name in ['Salt', 'Pepper', 'Garlic', 'Oil', 'Onion',
+                         'Sugar', 'Flour', 'Butter']
+        }
+        self.recipe = self.create_recipe(
+            'Pasta', ['Salt', 'Pepper', 'Garlic', 'Oil'])
+        self.close = self.create_recipe(
+            'Pasta with onion', ['Salt', 'Pepper', 'Garlic', 'Oil', 'Onion'])
+        self.other = self.create_recipe(
+            'Cake', ['Sugar', 'Flour', 'Butter'])
+
+    def create_recipe(self, title, ingredients):
+        recipe = Recipe.objects.create(
+            user=self.user, title=title, time_minutes=10,
+            price=Decimal('5.00'))
+        recipe.ingredients.add(*[self.pantry[name] for name in ingredients])
+        return recipe
+
+    def test_similar_recipes(self):
+        """Test recipes sharing ingredients are returned with a score."""
+        update_index()
+
+        response = self.client.get(similar_url(self.recipe.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in response.data], [self.close.id])
+        self.assertEqual(response.data[0]['similarity'], 0.8)
+
+    def test_update_index_incremental(self):
+        """Test the command only reindexes changed recipes."""
+        update_index()
+        self.assertFalse(similarity.stale_recipes().exists())
+
+        self.other.ingredients.add(self.pantry['Salt'])
+
+        self.assertEqual(list(similarity.stale_recipes()), [self.other])
+        update_index()
+        self.assertFalse(similarity.stale_recipes().exists())
+
+    def test_edit_while_indexing_stays_stale(self):
+        """Test a recipe edited after its features were read stays stale."""
+        features_of = similarity.features_of
+
+        def edit_meanwhile(ids):
+            features = features_of(ids)
+            # a writer whose clock is behind the indexer's
+            Recipe.objects.filter(id=self.other.id).update(
+                update_on=timezone.now() - timedelta(minutes=1))
+            return features
+
+        with patch.object(similarity, 'features_of', edit_meanwhile):
+            update_index()
+
+        self.assertEqual(list(similarity.stale_recipes()), [self.other])
+
+    def test_rebuild(self):
+        """Test --rebuild reindexes every recipe."""
+        update_index()
+        RecipeBand.objects.all().delete()
+
+        update_index(rebuild=True)
+
+        self.assertEqual(RecipeBand.objects.count(), 3 * similarity.BANDS)
+
+    def test_stale_recipe_indexed_on_lookup(self):
+        """Test a recipe not indexed yet is indexed when looked up."""
+        update_index()
+        recipe = self.create_recipe(
+            'Garlic pasta', ['Salt', 'Pepper', 'Garlic', 'Oil'])
+
+        response = self.client.get(similar_url(recipe.id))
+
+        self.assertIn(self.recipe.id, [r['id'] for r in response.data])
+        self.assertEqual(
+            RecipeBand.objects.filter(recipe=recipe).count(),
+            similarity.BANDS)
+
+    def test_deleted_recipes_excluded(self):
+        """Test soft deleted recipes aren't suggested."""
+        update_index()
+        soft_delete(self.close)
+
+        response = self.client.get(similar_url(self.recipe.id))
+
+        self.assertEqual(response.data, [])
+        update_index()
+        self.assertFalse(
+            RecipeBand.objects.filter(recipe=self.close).exists())
+
+    def test_other_users_recipes_excluded(self):
+        """Test only the user's own recipes are suggested."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        recipe = Recipe.objects.create(
+            user=other, title='Copy', time_minutes=1, price=Decimal('1'))
+        recipe.ingredients.add(*self.recipe.ingredients.all())
+        update_index()
+
+        response = self.client.get(similar_url(self.recipe.id))
+
+        self.assertNotIn(recipe.id, [r['id'] for r in response.data])
@@ -0,0 +1,132 @@
+"""
+Tests for the delta sync API.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Tombstone
+
+
+SYNC_URL = reverse('recipe:sync')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(SYNC_LAG=0)
+class SyncApiTests(TestCase):
+    """Test the delta sync endpoint."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='sync@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync_all(self, **params):
+        """Follow next cursors, return merged pages and the watermark."""
+        merged = {'recipes': [], 'tags': [], 'ingredients': [], 'deleted': []}
+        response = self.client.get(SYNC_URL, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            for name in merged:
+                merged[name] += response.data[name]
+            if response.data['next'] is None:
+                return merged, response.data['watermark']
+            response = self.client.get(SYNC_URL, {
+                'cursor': response.data['next'],
+                'limit': params.get('limit', 100),
+            })
+
+    def test_full_sync(self):
+        """Test a sync without watermark returns everything."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='testpass123')
+        create_recipe(other)
+
+        changes, watermark = self.sync_all()
+
+        self.assertEqual([r['id'] for r in changes['recipes']], [recipe.id])
+        self.assertEqual([t['id'] for t in changes['tags']], [tag.id])
+        self.assertEqual(changes['deleted'], [])
+        self.assertIsNotNone(watermark)
+
+    def test_delta_sync(self):
+        """Test only changes after the watermark are returned."""
+        unchanged = create_recipe(self.user, title='Unchanged')
+        updated = create_recipe(self.user, title='Updated')
+        deleted = create_recipe(self.user, title='Deleted')
+        since = timezone.now()
+        Recipe.objects.filter(
+            id__in=[unchanged.id, updated.id, deleted.id],
+        ).update(update_on=since - timedelta(minutes=1))
+
+        updated.title = 'Updated again'
+        updated.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        added = create_recipe(self.user, title='Added')
+
+        changes, _ = self.sync_all(since=since.isoformat())
+
+        self.assertEqual(
+            sorted(r['id'] for r in changes['recipes']),
+            sorted([updated.id, added.id]),
+        )
+        self.assertEqual(
+            [(d['kind'], d['id']) for d in changes['deleted']],
+            [(Tombstone.RECIPE, deleted_id)],
+        )
+
+    def test_tag_change_marks_recipe(self):
+        """Test changing recipe tags reports the recipe as changed."""
+        recipe = create_recipe(self.user)
+        since = timezone.now()
+        Recipe.objects.filter(id=recipe.id).update(
+            update_on=since - timedelta(minutes=1))
+
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        changes, _ = self.sync_all(since=since.isoformat())
+
+        self.assertEqual([r['id'] for r in changes['recipes']], [recipe.id])
+
+    def test_keyset_pagination(self):
+        """Test paging returns every change once."""
+        recipes = [create_recipe(self.user) for _ in range(5)]
+        # equal timestamps exercise the id tie breaker
+        Recipe.objects.update(update_on=timezone.now())
+
+        response = self.client.get(SYNC_URL, {'limit': 2})
+        self.assertEqual(len(response.data['recipes']), 2)
+        changes, _ = self.sync_all(limit=2)
+
+        self.assertEqual(
+            [r['id'] for r in changes['recipes']],
+            [r.id for r in recipes],
+        )
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected."""
+        response = self.client.get(SYNC_URL, {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -102,6 +102,27 @@ class PrivateTagsApiTest(TestCase):
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload['name'])
 
+    def test_rename_onto_existing_name_rejected(self):
+        """Test a rename can't duplicate another spelling of a name."""
+        Tag.objects.create(user=self.user, name='Dinner')
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+
+        response = self.client.patch(
+            detail_url(tag.id), {'name': 'dinner '})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Lunch')
+
+    def test_rename_own_spelling(self):
+        """Test a row can change the spelling of its own name."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+
+        response = self.client.patch(
+            detail_url(tag.id), {'name': 'dinner'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_delete_tag(self):
         """Test delete a tag."""
 
@@ -129,6 +150,7 @@ class PrivateTagsApiTest(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
+        tag1.refresh_from_db()
         s1 = TagSerializer(tag1)
         s2 = TagSerializer(tag2)
         self.assertIn(s1.data, res.data)
@@ -156,3 +178,70 @@ class PrivateTagsApiTest(TestCase):
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
         self.assertEqual(len(res.data), 1)
+
+
+class RecipeCountTests(TestCase):
+    """Test recipe_count follows changes of recipe tags."""
+
+    def setUp(self):
+        self.user = create_dummy_user()
+        self.tag = Tag.objects.create(user=self.user, name='Dinner')
+        self.recipes = [
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price=Decimal('1.00'),
+            )
+            for i in range(3)
+        ]
+
+    def assertCount(self, expected):
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.recipe_count, expected)
+
+    def test_add_and_remove(self):
+        """Test adding and removing from the recipe side."""
+        for recipe in self.recipes:
+            recipe.tags.add(self.tag)
+        self.recipes[0].tags.add(self.tag)
+        self.assertCount(3)
+
+        self.recipes[0].tags.remove(self.tag)
+        self.recipes[0].tags.remove(self.tag)
+        self.assertCount(2)
+
+        self.recipes[1].tags.clear()
+        self.assertCount(1)
+
+    def test_add_and_remove_reverse(self):
+        """Test adding and removing from the tag side."""
+        self.tag.recipe_set.add(*self.recipes)
+        self.assertCount(3)
+
+        self.tag.recipe_set.remove(self.recipes[0], self.recipes[0])
+        self.assertCount(2)
+
+        self.tag.recipe_set.clear()
+        self.assertCount(0)
+
+    def test_recipe_delete(self):
+        """Test deleting recipes releases their tags."""
+        self.tag.recipe_set.add(*self.recipes)
+
+        self.recipes[0].delete()
+        self.assertCount(2)
+
+        Recipe.objects.filter(user=self.user).delete()
+        self.assertCount(0)
+
+    def test_refresh_recipe_counts(self):
+        """Test counts are rebuilt after writes that skip signals."""
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=self.tag.id)
+            for recipe in self.recipes
+        ])
+        self.assertCount(0)
+
+        Tag.objects.filter(user=self.user).refresh_recipe_counts()
+        self.assertCount(3)
@@ -13,10 +13,14 @@ router = DefaultRouter()
 router.register('recipes', views.RecipeViewSet)
 router.register('tags', views.TagViewSet)
 router.register('ingredients', views.IngredientViewSet)
+router.register('shares', views.RecipeShareViewSet)
+router.register(
+    'public/recipes', views.PublicRecipeViewSet, basename='public-recipe')
 
 
 app_name = 'recipe'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('sync/', views.SyncView.as_view(), name='sync'),
 ]
@@ -8,16 +8,43 @@ from drf_spectacular.utils import (
     OpenApiTypes,
 )
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.cache import get_conditional_response, patch_cache_control
+
 from rest_framework import viewsets, mixins, status
+from rest_framework.exceptions import NotFound, ValidationError
 
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+
+from core import metrics
+from core.models import Recipe, RecipeShare, Tag, Ingredient
+from recipe import public, serializer, sync
+from recipe.copy import copy_recipe
+from recipe.deletion import soft_delete
+from recipe.pantry import cookable_recipes
+from recipe.similarity import similar_recipes
+from recipe.stats import get_stats
+from user.authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from user.throttles import UserRateThrottle
+
 
-from core.models import Recipe, Tag, Ingredient
-from recipe import serializer
+class RecipeShareThrottle(UserRateThrottle):
+    """Throttle offering recipes to other users."""
+    scope = 'recipe_share'
+
+    def get_ident_key(self, request):
+        if 'to' not in request.data:
+            # copies into the own account aren't throttled
+            return None
+        return super().get_ident_key(request)
 
 
 @extend_schema_view(
@@ -33,6 +60,7 @@ from recipe import serializer
                 OpenApiTypes.STR,
                 description='Comma separated list of ingredient IDs to filter',
             ),
+            serializer.RecipeFilterSerializer,
         ]
     )
 )
@@ -40,7 +68,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
     """View for manage recipe APIs"""
     serializer_class = serializer.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
 
     def _params_to_ints(self, qs):
@@ -61,9 +92,16 @@ class RecipeViewSet(viewsets.ModelViewSet):
             ingredient_ids = self._params_to_ints(ingredients)
             queryset = queryset.filter(ingredients__id__in=ingredient_ids)
 
+        # range filters and sorting, raises 400 on invalid values
+        filters = serializer.RecipeFilterSerializer(
+            data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filters.filter_queryset(queryset)
+
+        # prefetch nested tags/ingredients to avoid a query per recipe
         queryset = queryset.filter(
             user=self.request.user
-        ).order_by('-id').distinct()
+        ).distinct().prefetch_related('tags', 'ingredients')
         return queryset
 
     def get_serializer_class(self):
@@ -81,6 +119,103 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Create a new recipe."""
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Soft delete, purge_deleted removes the row later."""
+        soft_delete(instance)
+
+    @extend_schema(
+        request=serializer.RecipeCopySerializer,
+        responses={
+            201: serializer.RecipeDetailSerializer(many=True),
+            202: OpenApiTypes.OBJECT,
+        },
+    )
+    @action(methods=['POST'], detail=True,
+            throttle_classes=[RecipeShareThrottle])
+    def copy(self, request, pk=None):
+        """Copy a recipe, or offer it to another user with `to`."""
+        recipe = self.get_object()
+        params = serializer.RecipeCopySerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        if 'to' in params.validated_data:
+            recipient = get_user_model().objects.filter(
+                email=params.validated_data['to'], is_active=True,
+            ).exclude(pk=request.user.pk).first()
+            if recipient is not None:
+                RecipeShare.objects.bulk_create(
+                    [RecipeShare(recipe=recipe, recipient=recipient)],
+                    ignore_conflicts=True,
+                )
+            # same answer for unknown emails, registered ones don't leak
+            return Response(
+                {'detail': 'Recipe offered to the user.'},
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        new_ids = copy_recipe(
+            recipe, request.user, params.validated_data['count'])
+        copies = Recipe.objects.filter(id__in=new_ids).order_by(
+            'id').prefetch_related('tags', 'ingredients')
+        data = serializer.RecipeDetailSerializer(
+            copies, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        parameters=[serializer.CookableParamsSerializer],
+        responses=serializer.RecipeSerializer(many=True),
+    )
+    @action(methods=['GET'], detail=False)
+    def cookable(self, request):
+        """Return recipes that can be cooked from the given ingredients."""
+        params = serializer.CookableParamsSerializer(
+            data=request.query_params)
+        params.is_valid(raise_exception=True)
+        pantry = params.validated_data['ingredients']
+
+        recipes = cookable_recipes(
+            request.user, pantry, params.validated_data['missing'],
+        ).prefetch_related('tags', 'ingredients')[
+            :params.validated_data['limit']]
+        data = serializer.RecipeSerializer(
+            recipes, many=True, context=self.get_serializer_context()).data
+        for item, recipe in zip(data, recipes):
+            item['coverage'] = round(recipe.coverage, 3)
+            item['missing'] = [
+                ingredient['id'] for ingredient in item['ingredients']
+                if ingredient['id'] not in pantry
+            ]
+        return Response(data)
+
+    @extend_schema(
+        parameters=[serializer.SimilarParamsSerializer],
+        responses=serializer.RecipeSerializer(many=True),
+    )
+    @action(methods=['GET'], detail=True)
+    def similar(self, request, pk=None):
+        """Return own recipes sharing the most tags and ingredients."""
+        recipe = self.get_object()
+        params = serializer.SimilarParamsSerializer(
+            data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        scores = dict(similar_recipes(
+            recipe, params.validated_data['limit']))
+        recipes = Recipe.objects.filter(id__in=scores).prefetch_related(
+            'tags', 'ingredients')
+        data = serializer.RecipeSerializer(
+            recipes, many=True, context=self.get_serializer_context()).data
+        for item in data:
+            item['similarity'] = round(scores[item['id']], 3)
+        data.sort(key=lambda item: (-item['similarity'], item['id']))
+        return Response(data)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(methods=['GET'], detail=False)
+    def stats(self, request):
+        """Return aggregates over the recipes of the user."""
+        return Response(get_stats(request.user))
+
     # Create a new costum action excluding from CRUD in viewset
     # if detail is true then url must including from base url {id}
     @action(methods=['POST'], detail=True, url_path='upload-image')
@@ -92,6 +227,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         # check validation of incoming request that populate in choosen serizalier
         if serializer.is_valid():
+            metrics.IMAGE_UPLOAD_SIZE.observe(
+                serializer.validated_data['image'].size)
             # save data and create django style response data
             serializer.save()
             # will return saved serializer object with status HTTP 200
@@ -112,12 +249,51 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ]
     )
 )
+class RecipeShareViewSet(mixins.DestroyModelMixin,
+                         mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    """Recipes offered to the user, DELETE declines an offer."""
+    serializer_class = serializer.RecipeShareSerializer
+    queryset = RecipeShare.objects.all()
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Return live offers to the authenticated user."""
+        return self.queryset.filter(
+            recipient=self.request.user,
+            recipe__deleted_on__isnull=True,
+        ).select_related('recipe__user').order_by('-create_on', '-id')
+
+    @extend_schema(
+        request=None,
+        responses={201: serializer.RecipeDetailSerializer(many=True)},
+    )
+    @action(methods=['POST'], detail=True)
+    def accept(self, request, pk=None):
+        """Copy the offered recipe into the user's account."""
+        share = self.get_object()
+        new_ids = copy_recipe(share.recipe, request.user)
+        share.delete()
+        copies = Recipe.objects.filter(id__in=new_ids).prefetch_related(
+            'tags', 'ingredients')
+        data = serializer.RecipeDetailSerializer(
+            copies, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
 class BaseRecipeAttrViewSet(mixins.DestroyModelMixin,
                             mixins.UpdateModelMixin,
                             mixins.ListModelMixin,
                             viewsets.GenericViewSet):
     """Base viewset for recipe attributes"""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -129,12 +305,17 @@ class BaseRecipeAttrViewSet(mixins.DestroyModelMixin,
         )
         queryset = self.queryset
         if assigned_only:  # get tags/ingredients that already assigned to one or more recipe
-            queryset = queryset.filter(recipe__isnull=False)
+            # denormalized count, served by the (user, recipe_count) index
+            # without joining recipes or DISTINCT
+            queryset = queryset.filter(recipe_count__gt=0)
 
-        # distinct to remove duplicated resutl from query
         return queryset.filter(
             user=self.request.user
-        ).order_by('-name').distinct()
+        ).order_by('-name')
+
+    def perform_destroy(self, instance):
+        """Soft delete, purge_deleted removes the row later."""
+        soft_delete(instance)
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -166,3 +347,123 @@ class IngredientViewSet(BaseRecipeAttrViewSet):
     #     """Filtering queryset to authenticated user only."""
     #     # will filtering Tag data with incoming user request.
     #     return self.queryset.filter(user=self.request.user).order_by('-name')
+
+
+class SyncView(APIView):
+    """Return recipes, tags and ingredients changed since a watermark.
+
+    Start with ?since=<watermark of the last sync> (omit for a full
+    sync), then follow `next` until it is null and keep `watermark` for
+    the next sync.
+    """
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[serializer.SyncParamsSerializer],
+        responses=OpenApiTypes.OBJECT,
+    )
+    def get(self, request):
+        params = serializer.SyncParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if 'cursor' in data:
+            try:
+                state = sync.decode_cursor(data['cursor'])
+            except sync.InvalidCursor as exc:
+                raise ValidationError({'cursor': [str(exc)]})
+        else:
+            since = data.get('since')
+            if since and since < sync.oldest_watermark():
+                # tombstones of that time may be purged already
+                return Response(
+                    {'detail': 'Watermark expired, sync without since.'},
+                    status=status.HTTP_410_GONE,
+                )
+            state = sync.new_state(since)
+
+        changes, next_state = sync.get_changes(
+            request.user, state, data['limit'])
+        context = self.get_serializer_context()
+        return Response({
+            'recipes': serializer.RecipeDetailSerializer(
+                changes['recipes'], many=True, context=context).data,
+            'tags': serializer.TagSerializer(
+                changes['tags'], many=True, context=context).data,
+            'ingredients': serializer.IngredientSerializer(
+                changes['ingredients'], many=True, context=context).data,
+            'deleted': serializer.TombstoneSerializer(
+                changes['deleted'], many=True, context=context).data,
+            'next': sync.encode_cursor(next_state) if next_state else None,
+            'watermark': state['until'],
+        })
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+
+class PublicRecipeViewSet(viewsets.ViewSet):
+    """Read only feed of shared recipes, open to everyone.
+
+    Responses come from the shared cache (see recipe.public) and carry
+    public Cache-Control and ETag headers so CDNs and browsers can serve
+    repeated reads without reaching the app.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def _respond(self, request, entry):
+        response = get_conditional_response(request, etag=entry['etag'])
+        if response is None:
+            response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.PUBLIC_RECIPE_MAX_AGE,
+            stale_while_revalidate=settings.PUBLIC_RECIPE_STALE_TTL,
+        )
+        return response
+
+    @extend_schema(
+        parameters=[serializer.PublicFeedSerializer],
+        responses=serializer.PublicRecipeSerializer(many=True),
+    )
+    def list(self, request):
+        """Return a page of shared recipes, newest first."""
+        params = serializer.PublicFeedSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page = params.validated_data['page']
+
+        def compute():
+            # plain containers, the Return* ones reference the serializer
+            return list(serializer.PublicRecipeSerializer(
+                public.feed_page(page), many=True).data)
+
+        entry = public.get_or_compute(public.feed_cache_key(page), compute)
+        return self._respond(request, entry)
+
+    @extend_schema(responses=serializer.PublicRecipeSerializer)
+    def retrieve(self, request, pk=None):
+        """Return a shared recipe."""
+        try:
+            recipe_id = int(pk)
+        except ValueError:
+            raise NotFound()
+
+        def compute():
+            # misses are cached too, unknown ids can't bypass the cache
+            recipe = public.public_recipes().filter(id=recipe_id).first()
+            if recipe is None:
+                return None
+            return dict(serializer.PublicRecipeSerializer(recipe).data)
+
+        entry = public.get_or_compute(
+            public.recipe_cache_key(recipe_id), compute)
+        if entry['data'] is None:
+            raise NotFound()
+        return self._respond(request, entry)
@@ -2,11 +2,17 @@
 
 set -e
 
-python manage.py wait_for_db
+python manage.py wait_for_db --fast --timeout 60
 python manage.py collectstatic --noinput
+python manage.py build_schema
 python manage.py migrate
 # python manage.py test
 
+# shared directory for prometheus metrics of all uwsgi workers
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/metrics}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # run uwsgi in :9000 as master with 4 workers
 # enable multi- threading
 # module to use in app.wsgi
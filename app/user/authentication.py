@@ -0,0 +1,209 @@
+"""
+Authentication for the API.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import router
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from core.models import AuthToken
+from user.signing import verify_access
+
+
+def token_cache_key(key):
+    """Return cache key of a token lookup."""
+    return f'auth-token:{hashlib.sha1(key.encode()).hexdigest()}'
+
+
+def user_generation_key(user_id):
+    """Return cache key of the user generation counter."""
+    return f'auth-user-gen:{user_id}'
+
+
+def user_active_key(user_id):
+    """Return cache key of whether a user exists and is active."""
+    return f'auth-user-active:{user_id}'
+
+
+def invalidate_token(key):
+    """Drop the cached lookup of a token."""
+    cache.delete(token_cache_key(key))
+
+
+def invalidate_user(user_id):
+    """Make every cached token lookup and active flag of a user stale.
+
+    Bumps a per-user generation number stored with each cached lookup,
+    so all tokens of the user are invalidated with a single cache write.
+    """
+    key = user_generation_key(user_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+class LastUsedRecorder:
+    """Buffer token usage in memory and write it in batches.
+
+    Keeps AuthToken.last_used roughly current without a DB write per
+    request: timestamps are flushed with a single UPDATE at most once per
+    TOKEN_LAST_USED_FLUSH_INTERVAL seconds per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def touch(self, key):
+        with self._lock:
+            self._pending[key] = timezone.now()
+            due = (time.monotonic() - self._last_flush
+                   >= settings.TOKEN_LAST_USED_FLUSH_INTERVAL)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        whens = [When(key=key, then=Value(used))
+                 for key, used in pending.items()]
+        AuthToken.objects.filter(key__in=pending).update(
+            last_used=Case(*whens, output_field=DateTimeField()))
+
+
+last_used = LastUsedRecorder()
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """Token authentication with expiry and cached lookups.
+
+    Lookups are cached for TOKEN_CACHE_TTL seconds so steady traffic
+    doesn't query the token table, request.auth is the token key.
+    """
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        entry = cache.get(token_cache_key(key))
+        if entry is not None:
+            generation = cache.get(user_generation_key(entry['user'].pk), 0)
+            if entry['generation'] != generation:
+                entry = None
+
+        if entry is None:
+            entry = self._load(key)
+
+        if entry['expires'] <= timezone.now():
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        if not entry['user'].is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        last_used.touch(key)
+        return (entry['user'], key)
+
+    def _load(self, key):
+        """Read token from the database and cache it."""
+        try:
+            token = AuthToken.objects.select_related('user').get(key=key)
+        except AuthToken.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        entry = {
+            'user': token.user,
+            'expires': token.expires,
+            # a user change racing this read is only missed until the
+            # entry expires, at most TOKEN_CACHE_TTL seconds
+            'generation': cache.get(user_generation_key(token.user_id), 0),
+        }
+        # never cache past expiry
+        ttl = min(settings.TOKEN_CACHE_TTL,
+                  (token.expires - timezone.now()).total_seconds())
+        if ttl > 0:
+            cache.set(token_cache_key(key), entry, timeout=ttl)
+        return entry
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate "Bearer <token>" signed access tokens.
+
+    The token is verified by signature, whether its user still exists and
+    is active is cached like token lookups, so deactivating a user revokes
+    their tokens right away. request.user is a User with every field but
+    the id and is_active deferred, fields are loaded on first access, so
+    views that only filter by user run no auth query at all.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid bearer header.'))
+
+        try:
+            token = auth[1].decode()
+            user_id = verify_access(token)
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not self._is_active(user_id):
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        User = get_user_model()
+        user = User.from_db(
+            router.db_for_read(User),
+            [User._meta.pk.attname, 'is_active'],
+            [user_id, True],
+        )
+        return (user, token)
+
+    def _is_active(self, user_id):
+        """Return whether the user exists and is active.
+
+        Cached for TOKEN_CACHE_TTL seconds with the user generation, so
+        saving the user makes the cached flag stale.
+        """
+        key = user_active_key(user_id)
+        generation_key = user_generation_key(user_id)
+        cached = cache.get_many([key, generation_key])
+        generation = cached.get(generation_key, 0)
+        entry = cached.get(key)
+        if entry is not None and entry['generation'] == generation:
+            return entry['active']
+
+        active = get_user_model().objects.filter(
+            pk=user_id, is_active=True).exists()
+        cache.set(key, {'active': active, 'generation': generation},
+                  timeout=settings.TOKEN_CACHE_TTL)
+        return active
+
+    def authenticate_header(self, request):
+        return self.keyword
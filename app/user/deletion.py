@@ -0,0 +1,82 @@
+"""
+Chunked deletion of a user and everything they own.
+
+User.delete() lets Django's Collector load every dependent row (and
+fire its signals) before deleting, in one transaction. delete_user()
+instead removes dependents table by table with raw DELETEs of at most
+batch_size ids, each batch committed on its own, so memory stays
+constant and no lock is held for long. The user row itself is deleted
+last, when only a handful of dependents remain.
+"""
+from django.db import router, transaction
+from django.db.models import Q
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    AuthToken,
+    Ingredient,
+    Recipe,
+    RecipeBand,
+    RecipeShare,
+    Tag,
+    Tombstone,
+)
+from recipe.stats import invalidate_stats
+from user.authentication import invalidate_user
+
+
+def _dependents(user):
+    """Return (label, queryset) of rows to delete, children first."""
+    recipes = Recipe.all_objects.filter(user=user)
+    return [
+        ('recipe tags', Recipe.tags.through.objects.filter(
+            recipe__in=recipes)),
+        ('recipe ingredients', Recipe.ingredients.through.objects.filter(
+            recipe__in=recipes)),
+        ('similarity buckets', RecipeBand.objects.filter(user=user)),
+        ('recipe shares', RecipeShare.objects.filter(
+            Q(recipient=user) | Q(recipe__in=recipes))),
+        ('recipes', recipes),
+        ('tags', Tag.all_objects.filter(user=user)),
+        ('ingredients', Ingredient.all_objects.filter(user=user)),
+        ('tombstones', Tombstone.objects.filter(user=user)),
+        ('tokens', AuthToken.objects.filter(user=user)),
+        ('legacy tokens', Token.objects.filter(user=user)),
+    ]
+
+
+def _delete_batches(queryset, batch_size):
+    """Raw delete queryset batch by batch, yields deleted totals."""
+    model = queryset.model
+    using = router.db_for_write(model)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return
+            # no Collector: no object loading, signals or cascades, the
+            # dependents of these rows are already gone
+            model._base_manager.filter(pk__in=ids)._raw_delete(using)
+        deleted += len(ids)
+        yield deleted
+
+
+def delete_user(user, batch_size=1000):
+    """Delete user and their data in batches.
+
+    Generator yielding (label, rows deleted so far) after every batch,
+    the user is gone once it is exhausted.
+    """
+    user_id = user.pk
+    # stop the user from authenticating while their data goes away
+    type(user)._base_manager.filter(pk=user_id).update(is_active=False)
+    invalidate_user(user_id)
+
+    for label, queryset in _dependents(user):
+        for deleted in _delete_batches(queryset, batch_size):
+            yield label, deleted
+
+    user.delete()
+    invalidate_stats(user_id)
+    yield 'users', 1
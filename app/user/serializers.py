@@ -3,12 +3,17 @@ Serializers for the user API view.
 """
 
 from django.contrib.auth import get_user_model, authenticate
+from django.core import signing
 from django.utils.translation import gettext as _
 
 from rest_framework import serializers
 
+from core.timing import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+from user.signing import password_fingerprint, verify_refresh
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for user object."""
 
     class Meta:
@@ -25,16 +30,27 @@ class UserSerializer(serializers.ModelSerializer):
         # ovveriding update function
         password = validated_data.pop('password', None)
 
-        user = super().update(instace, validated_data)
+        # the authenticated user may come from a cache, compare against
+        # the stored row so a stale copy neither skips nor reverts columns
+        instace = get_user_model().objects.get(pk=instace.pk)
+        changed = []
+        for attr, value in validated_data.items():
+            if getattr(instace, attr) != value:
+                setattr(instace, attr, value)
+                changed.append(attr)
 
         if password:
-            user.set_password(password)
-            user.save()
+            instace.set_password(password)
+            changed.append('password')
 
-        return user
+        # one save writing only the changed columns
+        if changed:
+            instace.save(update_fields=changed)
 
+        return instace
 
-class AuthTokenSerializer(serializers.Serializer):
+
+class AuthTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for the user authentication token."""
     email = serializers.EmailField()
     password = serializers.CharField(
@@ -57,3 +73,24 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class RefreshTokenSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for exchanging a signed refresh token."""
+    refresh = serializers.CharField(trim_whitespace=False)
+
+    def validate(self, attrs):
+        """Verify the refresh token and load its user."""
+        msg = _('Invalid or expired refresh token.')
+        try:
+            user_id, fingerprint = verify_refresh(attrs['refresh'])
+        except signing.BadSignature:
+            raise serializers.ValidationError(msg, code='authorization')
+
+        user = get_user_model().objects.filter(
+            pk=user_id, is_active=True).first()
+        if user is None or password_fingerprint(user) != fingerprint:
+            raise serializers.ValidationError(msg, code='authorization')
+
+        attrs['user'] = user
+        return attrs
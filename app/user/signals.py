@@ -0,0 +1,21 @@
+"""
+Signal handlers for the user app.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_user
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_tokens(sender, instance, created, **kwargs):
+    """Drop cached token lookups holding the old user state.
+
+    Invalidated right away and again on commit, a lookup racing the
+    transaction could otherwise cache the old row until it expires.
+    """
+    if not created:
+        invalidate_user(instance.pk)
+        transaction.on_commit(lambda: invalidate_user(instance.pk))
@@ -0,0 +1,71 @@
+"""
+Signed, stateless API tokens.
+
+Access tokens carry the user id and are verified by signature, plus a
+cached check that the user is still active (see
+SignedTokenAuthentication), so authenticating a request rarely needs a
+database query. Refresh
+tokens also carry a fingerprint of the password hash and are checked
+against the user on refresh, changing the password or deactivating the
+user revokes them.
+
+Tokens are signed with SECRET_KEY. To rotate it, move the old key to
+SIGNED_TOKEN_FALLBACK_KEYS until SIGNED_TOKEN_REFRESH_TTL has passed.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+
+ACCESS_SALT = 'user.signing.access'
+REFRESH_SALT = 'user.signing.refresh'
+
+
+def signing_keys():
+    """Return current key first, followed by keys still accepted."""
+    return [settings.SECRET_KEY, *settings.SIGNED_TOKEN_FALLBACK_KEYS]
+
+
+def password_fingerprint(user):
+    """Return a short digest that changes with the user's password."""
+    return hashlib.sha256(user.password.encode()).hexdigest()[:16]
+
+
+def _loads(token, salt, max_age):
+    """Verify token against every accepted key and return its payload."""
+    for key in signing_keys():
+        try:
+            return signing.loads(token, key=key, salt=salt, max_age=max_age)
+        except signing.SignatureExpired:
+            # signature matched, trying older keys can't help
+            raise
+        except signing.BadSignature:
+            continue
+    raise signing.BadSignature('Signature does not match any key.')
+
+
+def issue_tokens(user):
+    """Return a new access and refresh token pair for user."""
+    return {
+        'access': signing.dumps(
+            {'u': user.pk}, key=settings.SECRET_KEY, salt=ACCESS_SALT),
+        'refresh': signing.dumps(
+            {'u': user.pk, 'p': password_fingerprint(user)},
+            key=settings.SECRET_KEY, salt=REFRESH_SALT),
+        'access_expires_in': settings.SIGNED_TOKEN_ACCESS_TTL,
+        'refresh_expires_in': settings.SIGNED_TOKEN_REFRESH_TTL,
+    }
+
+
+def verify_access(token):
+    """Return the user id of an access token.
+
+    Raises signing.BadSignature (or its subclass SignatureExpired).
+    """
+    return _loads(token, ACCESS_SALT, settings.SIGNED_TOKEN_ACCESS_TTL)['u']
+
+
+def verify_refresh(token):
+    """Return (user id, password fingerprint) of a refresh token."""
+    payload = _loads(token, REFRESH_SALT, settings.SIGNED_TOKEN_REFRESH_TTL)
+    return payload['u'], payload['p']
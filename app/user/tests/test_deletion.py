@@ -0,0 +1,99 @@
+"""
+Tests for chunked user deletion.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import AuthToken, Recipe, Tag, Ingredient
+from user.deletion import delete_user
+
+
+def create_user(email='owner@example.com'):
+    """Create a user with recipes, tags, ingredients and a token."""
+    user = get_user_model().objects.create_user(
+        email=email, password='testpass123')
+    tags = [Tag.objects.create(user=user, name=f'tag {i}') for i in range(3)]
+    ingredient = Ingredient.objects.create(user=user, name='Salt')
+    for i in range(5):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(ingredient)
+    AuthToken.objects.create(user=user)
+    return user
+
+
+class DeleteUserTests(TestCase):
+    """Test deleting a user and their data in batches."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.other = create_user(email='other@example.com')
+
+    def test_delete_user(self):
+        """Test the user and their data are gone, others untouched."""
+        progress = list(delete_user(self.user, batch_size=2))
+
+        self.assertFalse(
+            get_user_model().objects.filter(id=self.user.id).exists())
+        self.assertEqual(Recipe.all_objects.count(), 5)
+        self.assertEqual(Tag.all_objects.count(), 3)
+        self.assertEqual(Recipe.tags.through.objects.count(), 15)
+        self.assertEqual(AuthToken.objects.count(), 1)
+        # every batch reports, 15 tag links in batches of 2
+        self.assertIn(('recipe tags', 15), progress)
+        self.assertIn(('recipe tags', 2), progress)
+        self.assertEqual(progress[-1], ('users', 1))
+
+    def test_deletes_in_batches(self):
+        """Test dependent rows are deleted batch_size at a time."""
+        with CaptureQueriesContext(connection) as queries:
+            list(delete_user(self.user, batch_size=2))
+
+        link_deletes = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('DELETE FROM "core_recipe_tags"')
+        ]
+        # 15 links, ceil(15 / 2) statements
+        self.assertEqual(len(link_deletes), 8)
+
+    def test_delete_user_command(self):
+        """Test delete_user reports progress."""
+        out = StringIO()
+        call_command('delete_user', self.user.email, stdout=out)
+
+        self.assertIn('Deleted owner@example.com.', out.getvalue())
+        self.assertFalse(
+            get_user_model().objects.filter(id=self.user.id).exists())
+
+    def test_delete_user_command_unknown(self):
+        """Test delete_user rejects unknown emails."""
+        with self.assertRaises(CommandError):
+            call_command('delete_user', 'nobody@example.com')
+
+    def test_admin_action(self):
+        """Test the admin action deletes the selected users."""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123')
+        self.client.force_login(admin)
+
+        response = self.client.post(reverse('admin:core_user_changelist'), {
+            'action': 'delete_in_batches',
+            '_selected_action': [self.user.id],
+        }, follow=True)
+
+        self.assertContains(response, 'Deleted owner@example.com')
+        self.assertFalse(
+            get_user_model().objects.filter(id=self.user.id).exists())
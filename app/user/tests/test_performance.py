@@ -0,0 +1,81 @@
+"""
+Query count tests for user APIs.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from core.tests.utils import QueryCountMixin
+
+CREATE_USER_URL = reverse('user:create')
+TOKEN_URL = reverse('user:token')
+ME_URL = reverse('user:me')
+
+
+def create_users(count):
+    """Bulk create users with recipes, without hashing passwords."""
+    User = get_user_model()
+    offset = User.objects.count()
+    users = User.objects.bulk_create([
+        User(email=f'bulk{offset + i}@example.com', password='!')
+        for i in range(count)
+    ])
+    Recipe.objects.bulk_create([
+        Recipe(user=user, title='Recipe', time_minutes=5, price=1)
+        for user in get_user_model().objects.filter(
+            email__in=[u.email for u in users])
+    ])
+
+
+class UserQueryCountTests(QueryCountMixin, TestCase):
+    """Test query count of every user route doesn't grow with data."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='perf@example.com',
+            password='testpass123',
+            name='Perf',
+        )
+        self.client = APIClient()
+
+    def add_data(self):
+        create_users(99)
+
+    def test_create_user(self):
+        """Test creating a user."""
+        emails = iter(['new1@example.com', 'new2@example.com'])
+        self.assertQueriesBounded(2, lambda: self.client.post(
+            CREATE_USER_URL, {
+                'email': next(emails),
+                'password': 'testpass123',
+                'name': 'New',
+            }), status.HTTP_201_CREATED)
+
+    def test_create_token(self):
+        """Test obtaining a token."""
+        self.assertQueriesBounded(2, lambda: self.client.post(TOKEN_URL, {
+            'email': 'perf@example.com',
+            'password': 'testpass123',
+        }))
+
+    def test_retrieve_me(self):
+        """Test retrieving the authenticated user."""
+        self.client.force_authenticate(user=self.user)
+        self.assertQueriesBounded(0, lambda: self.client.get(ME_URL))
+
+    def test_update_me(self):
+        """Test updating the authenticated user."""
+        self.client.force_authenticate(user=self.user)
+        names = iter(['Updated', 'Updated again'])
+        self.assertQueriesBounded(
+            2, lambda: self.client.patch(ME_URL, {'name': next(names)}))
+
+    def test_update_me_unchanged(self):
+        """Test an update without changes writes nothing."""
+        self.client.force_authenticate(user=self.user)
+        self.assertQueriesBounded(
+            1, lambda: self.client.patch(ME_URL, {'name': 'Perf'}))
@@ -0,0 +1,138 @@
+"""
+Tests for signed, stateless API tokens.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from user.authentication import SignedTokenAuthentication
+from user.signing import issue_tokens
+
+
+SIGNED_TOKEN_URL = reverse('user:token-signed')
+REFRESH_URL = reverse('user:token-refresh')
+ME_URL = reverse('user:me')
+
+
+class SignedTokenTests(TestCase):
+    """Test issuing, verifying and refreshing signed tokens."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='signed@example.com',
+            password='testpass123',
+            name='Signed',
+        )
+        self.client = APIClient()
+        cache.clear()
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_returns_token_pair(self):
+        """Test login returns access and refresh tokens."""
+        payload = {'email': 'signed@example.com', 'password': 'testpass123'}
+        response = self.client.post(SIGNED_TOKEN_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.authenticate(response.data['access'])
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_authenticate_without_queries(self):
+        """Test a known user's access token is verified without the DB."""
+        token = issue_tokens(self.user)['access']
+        request = APIRequestFactory().get(
+            ME_URL, HTTP_AUTHORIZATION=f'Bearer {token}')
+        SignedTokenAuthentication().authenticate(request)
+
+        with self.assertNumQueries(0):
+            user, _ = SignedTokenAuthentication().authenticate(request)
+            self.assertEqual(user.pk, self.user.pk)
+
+    def test_deactivation_revokes_access(self):
+        """Test access tokens of a deactivated user stop working."""
+        self.authenticate(issue_tokens(self.user)['access'])
+        self.assertEqual(self.client.get(ME_URL).status_code,
+                         status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected(self):
+        """Test access tokens of a deleted user are rejected."""
+        self.authenticate(issue_tokens(self.user)['access'])
+        self.user.delete()
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_access_token_rejected(self):
+        """Test an access token older than its TTL is rejected."""
+        self.authenticate(issue_tokens(self.user)['access'])
+
+        with override_settings(SIGNED_TOKEN_ACCESS_TTL=-1):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_token_not_accepted_as_access(self):
+        """Test a refresh token can't authenticate requests."""
+        self.authenticate(issue_tokens(self.user)['refresh'])
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh(self):
+        """Test a refresh token is exchanged for a new pair."""
+        refresh = issue_tokens(self.user)['refresh']
+
+        response = self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+        self.assertIn('refresh', response.data)
+
+    def test_refresh_revoked_by_password_change(self):
+        """Test changing the password revokes refresh tokens."""
+        refresh = issue_tokens(self.user)['refresh']
+        self.user.set_password('newpass123')
+        self.user.save()
+
+        response = self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rotated_key_accepted_as_fallback(self):
+        """Test tokens signed with a previous key verify while listed."""
+        with override_settings(SECRET_KEY='old-key'):
+            token = issue_tokens(self.user)['access']
+        self.authenticate(token)
+
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(SIGNED_TOKEN_FALLBACK_KEYS=['old-key']):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_user_with_signed_token(self):
+        """Test updating the user authenticated by a signed token."""
+        self.authenticate(issue_tokens(self.user)['access'])
+
+        response = self.client.patch(ME_URL, {'name': 'Updated'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Updated')
+        self.assertEqual(self.user.email, 'signed@example.com')
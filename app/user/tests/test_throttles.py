@@ -0,0 +1,117 @@
+"""
+Tests for throttling of the user API.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.throttles import parse_rate
+
+CREATE_USER_URL = reverse('user:create')
+TOKEN_URL = reverse('user:token')
+
+
+def throttle_rates(**rates):
+    """Return REST_FRAMEWORK settings with given throttle rates."""
+    return {
+        'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+        'DEFAULT_THROTTLE_RATES': rates,
+    }
+
+
+class ParseRateTests(SimpleTestCase):
+    """Test parsing throttle rates."""
+
+    def test_parse_rate(self):
+        """Test rates with and without window count."""
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('20/10m'), (20, 600))
+        self.assertEqual(parse_rate('100/d'), (100, 86400))
+        self.assertIsNone(parse_rate(None))
+
+    def test_parse_invalid_rate(self):
+        """Test invalid rate raises ValueError."""
+        with self.assertRaises(ValueError):
+            parse_rate('5 per minute')
+
+
+class ThrottleApiTests(TestCase):
+    """Test throttled user endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        get_user_model().objects.create_user(
+            email='throttle@example.com',
+            password='testpass123',
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(login_email='2/m'))
+    @patch('user.serializers.authenticate')
+    def test_login_throttled_by_email_before_hashing(self, patched_auth):
+        """Test login is rejected with 429 without authenticating."""
+        patched_auth.return_value = None
+        payload = {'email': 'throttle@example.com', 'password': 'wrong'}
+
+        for _ in range(2):
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(TOKEN_URL, {
+            'email': 'THROTTLE@example.com', 'password': 'wrong'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(patched_auth.call_count, 2)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(login_ip='2/m'))
+    def test_login_throttled_by_ip(self):
+        """Test login is rejected once an IP used its burst."""
+        for i in range(2):
+            self.client.post(TOKEN_URL, {
+                'email': f'user{i}@example.com', 'password': 'wrong'})
+
+        res = self.client.post(TOKEN_URL, {
+            'email': 'other@example.com', 'password': 'wrong'})
+        other_ip = self.client.post(TOKEN_URL, {
+            'email': 'other@example.com', 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other_ip.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(login_ip='2/m'))
+    def test_login_ip_ignores_forwarded_for(self):
+        """Test a spoofed X-Forwarded-For doesn't reset the IP throttle."""
+        for i in range(3):
+            res = self.client.post(TOKEN_URL, {
+                'email': 'other@example.com', 'password': 'wrong'},
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(register_ip='1/h'))
+    def test_register_throttled_by_ip(self):
+        """Test creating users is throttled by IP."""
+        payload = {
+            'email': 'new@example.com',
+            'password': 'testpass123',
+            'name': 'New',
+        }
+        res = self.client.post(CREATE_USER_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        payload['email'] = 'new2@example.com'
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(
+            get_user_model().objects.filter(email=payload['email']).exists())
@@ -0,0 +1,140 @@
+"""
+Tests for expiring API tokens.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import AuthToken
+from user.authentication import last_used
+
+
+TOKEN_URL = reverse('user:token')
+ROTATE_URL = reverse('user:token-rotate')
+ME_URL = reverse('user:me')
+
+
+class TokenTests(TestCase):
+    """Test issuing, expiring and rotating tokens."""
+
+    def setUp(self):
+        cache.clear()
+        last_used.flush()
+        self.user = get_user_model().objects.create_user(
+            email='token@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_login_issues_expiring_token(self):
+        """Test login returns a new token with its expiry."""
+        payload = {'email': 'token@example.com', 'password': 'testpass123'}
+        response = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = AuthToken.objects.get(key=response.data['token'])
+        self.assertEqual(token.user, self.user)
+        self.assertGreater(token.expires, timezone.now())
+
+    def test_expired_token_rejected(self):
+        """Test an expired token can't authenticate."""
+        token = AuthToken.objects.create(
+            user=self.user, expires=timezone.now() - timedelta(seconds=1))
+        self.authenticate(token)
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotate_token(self):
+        """Test rotating revokes the old token and returns a new one."""
+        token = AuthToken.objects.create(user=self.user)
+        self.authenticate(token)
+
+        response = self.client.post(ROTATE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(AuthToken.objects.filter(key=token.key).exists())
+        self.assertEqual(self.client.get(ME_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {response.data["token"]}')
+        self.assertEqual(self.client.get(ME_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_lookup_cached(self):
+        """Test repeated requests don't query the token table."""
+        self.authenticate(AuthToken.objects.create(user=self.user))
+        self.client.get(ME_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+    def test_user_change_invalidates_cache(self):
+        """Test deactivating a user rejects their cached tokens."""
+        self.authenticate(AuthToken.objects.create(user=self.user))
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_last_used_written_in_batches(self):
+        """Test last_used is only written once the flush interval passed."""
+        token = AuthToken.objects.create(user=self.user)
+        self.authenticate(token)
+
+        self.client.get(ME_URL)
+        token.refresh_from_db()
+        self.assertIsNone(token.last_used)
+
+        with override_settings(TOKEN_LAST_USED_FLUSH_INTERVAL=0):
+            self.client.get(ME_URL)
+        token.refresh_from_db()
+        self.assertIsNotNone(token.last_used)
+
+    def test_purge_tokens(self):
+        """Test purge_tokens deletes only expired tokens."""
+        valid = AuthToken.objects.create(user=self.user)
+        for _ in range(3):
+            AuthToken.objects.create(
+                user=self.user, expires=timezone.now() - timedelta(hours=1))
+
+        call_command('purge_tokens', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(AuthToken.objects.values_list('key', flat=True)),
+            [valid.key],
+        )
+
+    def test_user_change_invalidates_cache_on_commit(self):
+        """Test a lookup cached during the transaction is dropped on commit."""
+        self.authenticate(AuthToken.objects.create(user=self.user))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = 'Renamed'
+            self.user.save()
+            # request racing the transaction caches the user again
+            self.client.get(ME_URL)
+
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.data['name'], 'Renamed')
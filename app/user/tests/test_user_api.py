@@ -2,7 +2,9 @@
 Tests for user API
 """
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -200,3 +202,28 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_compares_stored_row(self):
+        """Test a stale authenticated user doesn't skip changed fields."""
+        get_user_model().objects.filter(pk=self.user.pk).update(name='Other')
+
+        response = self.client.patch(ME_URL, {'name': self.user.name})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, response.data['name'])
+
+    def test_update_writes_changed_fields_only(self):
+        """Test an update saves once and only the changed columns."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(
+                ME_URL, {'name': 'New name', 'password': 'newpass123'})
+
+        updates = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"name"', updates[0])
+        self.assertIn('"password"', updates[0])
+        self.assertNotIn('"email"', updates[0])
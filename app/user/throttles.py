@@ -0,0 +1,113 @@
+"""
+Throttles for the user API.
+"""
+import hashlib
+import re
+import time
+
+from django.core.cache import cache
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+# "<requests>/<window>", window is an optional count plus s/m/h/d
+# e.g. '5/m' or '20/10m'
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Return (requests, window seconds) of a rate or None."""
+    if rate is None:
+        return None
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f'Invalid throttle rate {rate!r}')
+    num_requests, count, period = match.groups()
+    return int(num_requests), int(count or 1) * PERIODS[period]
+
+
+class CounterRateThrottle(BaseThrottle):
+    """Fixed window throttle backed by an atomic cache counter.
+
+    Costs one cache add + incr per request, so it is cheap enough to run
+    before any password hashing. Rate is read from DEFAULT_THROTTLE_RATES
+    using the throttle scope, a rate of None disables the throttle.
+    """
+    scope = None
+
+    def get_ident_key(self, request):
+        """Return the value requests are counted by, or None to skip."""
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        ident = self.get_ident_key(request)
+        if rate is None or not ident:
+            return True
+
+        self.num_requests, self.duration = rate
+        now = time.time()
+        window = int(now // self.duration)
+        self.window_end = (window + 1) * self.duration - now
+
+        # hash ident so emails are never stored and keys stay cache safe
+        digest = hashlib.sha1(ident.encode()).hexdigest()
+        key = f'throttle:{self.scope}:{digest}:{window}'
+        # add is a no-op when the key exists, incr is atomic
+        cache.add(key, 0, timeout=self.duration)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            cache.add(key, 1, timeout=self.duration)
+            count = 1
+        return count <= self.num_requests
+
+    def wait(self):
+        return self.window_end
+
+
+class UserRateThrottle(CounterRateThrottle):
+    """Throttle by authenticated user."""
+
+    def get_ident_key(self, request):
+        if not request.user.is_authenticated:
+            return None
+        return str(request.user.pk)
+
+
+class IPRateThrottle(CounterRateThrottle):
+    """Throttle by client IP address."""
+
+    def get_ident_key(self, request):
+        # set by nginx from $remote_addr (uwsgi_params), unlike
+        # X-Forwarded-For it can't be chosen by the client
+        return request.META.get('REMOTE_ADDR')
+
+
+class EmailRateThrottle(CounterRateThrottle):
+    """Throttle by the email submitted in the request body."""
+
+    def get_ident_key(self, request):
+        email = request.data.get('email')
+        if not isinstance(email, str):
+            return None
+        return email.strip().lower()
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = 'login_email'
+
+
+class RegisterIPThrottle(IPRateThrottle):
+    scope = 'register_ip'
+
+
+class RegisterEmailThrottle(EmailRateThrottle):
+    scope = 'register_email'
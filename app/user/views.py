@@ -2,30 +2,108 @@
 Views for user API
 """
 
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from core.models import AuthToken
 
-from .serializers import UserSerializer, AuthTokenSerializer
+from .authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+    invalidate_token,
+)
+from .serializers import (
+    UserSerializer,
+    AuthTokenSerializer,
+    RefreshTokenSerializer,
+)
+from .signing import issue_tokens
+from . import throttles
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
+    throttle_classes = [
+        throttles.RegisterIPThrottle,
+        throttles.RegisterEmailThrottle,
+    ]
 
 
 class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user."""
     serializer_class = AuthTokenSerializer
+    # throttles run before the serializer, so before password hashing
+    throttle_classes = [
+        throttles.LoginIPThrottle,
+        throttles.LoginEmailThrottle,
+    ]
     # renderer_classes = api_settings.DEFAULT_RENDERED_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        """Issue a new expiring token for every login."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = AuthToken.objects.create(
+            user=serializer.validated_data['user'])
+        return Response({'token': token.key, 'expires': token.expires})
+
+
+class RotateTokenView(APIView):
+    """Replace the token used for this request with a new one."""
+    authentication_classes = [ExpiringTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """Issue a new token and revoke the current one."""
+        token = AuthToken.objects.create(user=request.user)
+        AuthToken.objects.filter(key=request.auth).delete()
+        invalidate_token(request.auth)
+        return Response(
+            {'token': token.key, 'expires': token.expires},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class CreateSignedTokenView(CreateTokenView):
+    """Create signed access and refresh tokens for user."""
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(issue_tokens(serializer.validated_data['user']))
+
+
+class RefreshSignedTokenView(generics.GenericAPIView):
+    """Exchange a refresh token for a new token pair."""
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(issue_tokens(serializer.validated_data['user']))
+
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retive and retun the authenticated user."""
-        return self.request.user
+        user = self.request.user
+        if user.get_deferred_fields():
+            # signed tokens authenticate without loading the user
+            user = get_user_model().objects.get(pk=user.pk)
+        return user
@@ -1,6 +1,13 @@
 server {
     listen ${LISTEN_PORT};
 
+    # compress text responses above 1KB, images are already compressed
+    gzip                on;
+    gzip_min_length     1024;
+    gzip_proxied        any;
+    gzip_vary           on;
+    gzip_types          application/json application/vnd.oai.openapi application/vnd.oai.openapi+json text/css application/javascript text/plain;
+
     location /static {
         alias vol/static;
     }